@@ -0,0 +1,68 @@
+"""Capture Pages Module. Save current copies of the pages that each receiver parses, so parser benchmark runs over
+real pages of each site.
+
+Usage:
+    python -m benchmark.capture_pages --search "weiss schwarz" --battle-id 900
+"""
+
+import argparse
+import asyncio
+import urllib.parse
+from pathlib import Path
+from typing import Dict
+
+from benchmark.parser_benchmark import PAGES_DIRECTORY
+from src.inf.http_client.http_client import HttpClient
+from src.ser.blackfire.service import BlackfireService
+from src.ser.ws_banner.service import WSBannerService
+from src.ser.ws_news.service import WSNews
+from src.ser.ws_today_card.service import WSTodayCard
+from src.ser.ws_tournament_en.service import WSTournamentEn
+from src.ser.ws_tournament_jp.service import WSTournamentJp
+
+
+def parse_args():
+    """Parse arguments from initial call."""
+    parser = argparse.ArgumentParser(description='Save pages parsed by receivers.')
+    parser.add_argument('--search', dest='search', default='weiss schwarz', help="Blackfire search of listing page.")
+    parser.add_argument('--battle-id', dest='battle_id', type=int, required=True, help="Japanese tournament page id.")
+    parser.add_argument('--output', dest='output', type=Path, default=PAGES_DIRECTORY, help="Directory of pages.")
+    return vars(parser.parse_args())
+
+
+def _get_pages(*, search: str, battle_id: int) -> Dict[str, str]:
+    """Url of each page by name of its saved file."""
+    # pylint: disable=protected-access
+    return {
+        'blackfire_list': BlackfireService._PRODUCTS_URL.format(urllib.parse.quote(search)),
+        'ws_banner_en': WSBannerService._EN_URL,
+        'ws_banner_jp': WSBannerService._JP_URL,
+        'ws_news': WSNews._URL,
+        'ws_today_card_en': WSTodayCard._EN_URL,
+        'ws_today_card_jp': WSTodayCard._JP_URL,
+        'ws_tournament_en': WSTournamentEn._EN_URL,
+        'ws_tournament_jp': WSTournamentJp._JP_URL.format(battle_id),
+    }
+
+
+async def _capture(*, pages: Dict[str, str], output: Path):
+    output.mkdir(parents=True, exist_ok=True)
+    http_client = HttpClient()
+    try:
+        for name, url in pages.items():
+            async with http_client.get(url) as resp:
+                resp.raise_for_status()
+                path = output / f'{name}.html'
+                path.write_bytes(await resp.read())
+            print(f"{url} -> {path}")
+    finally:
+        await http_client.close()
+
+
+def run(search: str, battle_id: int, output: Path):
+    """Save every page in output directory."""
+    asyncio.run(_capture(pages=_get_pages(search=search, battle_id=battle_id), output=output))
+
+
+if __name__ == '__main__':
+    run(**parse_args())
@@ -0,0 +1,53 @@
+"""Parser Benchmark Module. Compare html parser backends over saved pages of each receiver site. Pages are saved by
+benchmark.capture_pages, other pages can be given as arguments.
+
+Usage:
+    python -m benchmark.capture_pages --battle-id 900
+    python -m benchmark.parser_benchmark --repeat 10
+    python -m benchmark.parser_benchmark Blackfire=list.html "Weiß Schwarz - News"=information.html --repeat 10
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+from typing import List
+
+from src.ser.common.enums.parser_backend import ParserBackend
+from src.ser.common.html_parser import HtmlParser
+
+PAGES_DIRECTORY = Path(__file__).parent / 'pages'
+
+
+def parse_args():
+    """Parse arguments from initial call."""
+    parser = argparse.ArgumentParser(description='Compare html parser backends.')
+    parser.add_argument('pages',
+                        nargs='*',
+                        help="Saved pages as MODULE=PATH, where MODULE is the receiver module name. Pages captured "
+                        "in benchmark/pages are used by default.")
+    parser.add_argument('--repeat', dest='repeat', type=int, default=10, help="Parses per page and backend.")
+    return vars(parser.parse_args())
+
+
+def run(pages: List[str], repeat: int):
+    """Print mean milliseconds per parse of each available backend and speedup against html5lib."""
+    backends = [backend for backend in ParserBackend if HtmlParser.is_available(backend=backend)]
+    print(f"{'module':<40} " + ' '.join(f"{backend.value + ' ms':>15}" for backend in backends) + f" {'speedup':>8}")
+    if not pages:
+        pages = [f"{path.stem}={path}" for path in sorted(PAGES_DIRECTORY.glob('*.html'))]
+    if not pages:
+        raise SystemExit("No pages, capture them with: python -m benchmark.capture_pages --battle-id ID")
+    for page in pages:
+        module, path = page.split('=', 1)
+        markup = Path(path).read_bytes()
+        results = {}
+        for backend in backends:
+            html_parser = HtmlParser(backends=(backend, ))
+            results[backend] = timeit.timeit(lambda: html_parser.parse(markup), number=repeat) / repeat * 1000
+        best = min(results.values())
+        speedup = results.get(ParserBackend.HTML5LIB, best) / best
+        print(f"{module:<40} " + ' '.join(f"{results[backend]:>15.3f}" for backend in backends) + f" {speedup:>7.1f}x")
+
+
+if __name__ == '__main__':
+    run(**parse_args())
@@ -0,0 +1,48 @@
+"""Rich Text Benchmark Module. Compare native html converter with pandoc over saved publication html.
+
+Usage:
+    python -m benchmark.rich_text_benchmark page.html [page.html ...] --repeat 20
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+from typing import List
+
+import pypandoc
+
+from src.ser.common.enums.format_data import FormatData
+from src.ser.common.html_converter import HtmlConverter
+
+_TARGET_FORMATS = (FormatData.PLAIN, FormatData.MARKDOWN)
+
+
+def parse_args():
+    """Parse arguments from initial call."""
+    parser = argparse.ArgumentParser(description='Compare RichText conversion backends.')
+    parser.add_argument('paths', nargs='+', type=Path, help="Saved html files of publications.")
+    parser.add_argument('--repeat', dest='repeat', type=int, default=20, help="Conversions per file and backend.")
+    return vars(parser.parse_args())
+
+
+def _native(data: str, format_data: FormatData) -> str:
+    return HtmlConverter.convert(data, from_format=FormatData.HTML, to_format=format_data)
+
+
+def _pandoc(data: str, format_data: FormatData) -> str:
+    return pypandoc.convert_text(data, format_data.value, format=FormatData.HTML.value)
+
+
+def run(paths: List[Path], repeat: int):
+    """Print mean milliseconds per conversion of each backend."""
+    print(f"{'file':<40} {'format':<10} {'native ms':>10} {'pandoc ms':>10} {'speedup':>8}")
+    for path in paths:
+        data = path.read_text(encoding='utf-8')
+        for format_data in _TARGET_FORMATS:
+            native = timeit.timeit(lambda: _native(data, format_data), number=repeat) / repeat * 1000
+            pandoc = timeit.timeit(lambda: _pandoc(data, format_data), number=repeat) / repeat * 1000
+            print(f"{path.name:<40} {format_data.value:<10} {native:>10.3f} {pandoc:>10.3f} {pandoc / native:>7.1f}x")
+
+
+if __name__ == '__main__':
+    run(**parse_args())
@@ -0,0 +1,144 @@
+"""Sender Benchmark Module. Compare messages per second of polling sender loop with event driven sender loop.
+
+Legacy loop sleeps wait time after every publication, so it is run with a scaled down wait time, its throughput at
+real wait time is printed too.
+
+Usage:
+    python -m benchmark.sender_benchmark --messages 100 --wait-time 0.05 --send-time 0.001 --interval 0
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from asyncio import Queue, QueueEmpty
+from logging import getLogger
+
+from src.inf.file_store.file_store import FileStore
+from src.inf.outbox.outbox import Outbox
+from src.ser.common.enums.state import State
+from src.ser.common.itf.publication import Publication
+from src.ser.common.sender_mixin import SenderMixin
+from src.ser.common.value_object.queue_data import QueueData
+
+_LEGACY_WAIT_TIME = 5
+
+
+def parse_args():
+    """Parse arguments from initial call."""
+    parser = argparse.ArgumentParser(description='Compare sender loops.')
+    parser.add_argument('--messages', dest='messages', type=int, default=100, help="Publications put in queue.")
+    parser.add_argument('--wait-time', dest='wait_time', type=float, default=0.05, help="Sleep of legacy loop.")
+    parser.add_argument('--send-time', dest='send_time', type=float, default=0.001, help="Simulated send latency.")
+    parser.add_argument('--interval',
+                        dest='interval',
+                        type=float,
+                        default=0,
+                        help="Seconds between publications of source, 0 puts them all at once.")
+    return vars(parser.parse_args())
+
+
+class _Sender(SenderMixin):
+    """Sender that only waits simulated send latency. It is done when all publications are sent."""
+    def __init__(self, *, send_time: float, messages: int):
+        self._send_time = send_time
+        self._messages = messages
+        self.sent = 0
+        self.done = asyncio.Event()
+
+    async def _load_publication(self, *, queue_data) -> None:
+        await asyncio.sleep(self._send_time)
+        self.sent += 1
+        if self.sent == self._messages:
+            self.done.set()
+
+    async def _close(self) -> None:
+        self.done.set()
+
+
+async def _publish(*, publication_queue: Queue, messages: int, interval: float):
+    """Fake publication source. It puts publications in queue as a receiver does."""
+    for publication_id in range(messages):
+        await publication_queue.put(QueueData(channel=0, publication=Publication(publication_id=publication_id)))
+        if interval:
+            await asyncio.sleep(interval)
+
+
+async def _legacy_loop_manager(*, sender: _Sender, state_change_queue: Queue, publication_queue: Queue,
+                               file_store: FileStore, wait_time: float):
+    """Polling loop that senders used before: one publication per wait time."""
+    while True:
+        try:
+            queue_data: QueueData = publication_queue.get_nowait()
+            try:
+                await sender._load_publication(queue_data=queue_data)  # pylint: disable=protected-access
+            finally:
+                file_store.release(digests=queue_data.publication.digests)
+        except QueueEmpty:
+            try:
+                if state_change_queue.get_nowait() == State.STOP:
+                    return
+            except QueueEmpty:
+                pass
+        await asyncio.sleep(wait_time)
+
+
+async def _measure(*, legacy: bool, messages: int, wait_time: float, send_time: float, interval: float,
+                   file_store: FileStore, outbox: Outbox) -> float:
+    sender = _Sender(send_time=send_time, messages=messages)
+    publication_queue = Queue()
+    state_change_queue = Queue()
+    if legacy:
+        loop_manager = _legacy_loop_manager(sender=sender,
+                                            state_change_queue=state_change_queue,
+                                            publication_queue=publication_queue,
+                                            file_store=file_store,
+                                            wait_time=wait_time)
+    else:
+        loop_manager = sender._loop_manager(  # pylint: disable=protected-access
+            state_change_queue=state_change_queue,
+            logger=getLogger('benchmark'),
+            publication_queue=publication_queue,
+            file_store=file_store,
+            outbox=outbox)
+    task = asyncio.ensure_future(loop_manager)
+    start = time.perf_counter()
+    await _publish(publication_queue=publication_queue, messages=messages, interval=interval)
+    await sender.done.wait()
+    elapsed = time.perf_counter() - start
+    await state_change_queue.put(State.STOP)
+    await task
+    return messages / elapsed
+
+
+async def _measure_loops(*, messages: int, wait_time: float, send_time: float, interval: float):
+    with tempfile.TemporaryDirectory() as directory:
+        file_store = FileStore(directory=directory)
+        outbox = Outbox(path=os.path.join(directory, 'outbox.sqlite'))
+        results = []
+        for legacy in (True, False):
+            results.append(await _measure(legacy=legacy,
+                                          messages=messages,
+                                          wait_time=wait_time,
+                                          send_time=send_time,
+                                          interval=interval,
+                                          file_store=file_store,
+                                          outbox=outbox))
+        return results
+
+
+def run(messages: int, wait_time: float, send_time: float, interval: float):
+    """Print messages per second of legacy and event driven loops."""
+    legacy, current = asyncio.run(
+        _measure_loops(messages=messages, wait_time=wait_time, send_time=send_time, interval=interval))
+    legacy_real = 1 / (_LEGACY_WAIT_TIME + send_time)
+    print(f"{'loop':<35} {'messages/s':>12}")
+    print(f"{f'polling (wait {wait_time}s)':<35} {legacy:>12.2f}")
+    print(f"{f'polling (wait {_LEGACY_WAIT_TIME}s, estimated)':<35} {legacy_real:>12.2f}")
+    print(f"{'event driven':<35} {current:>12.2f}")
+    print(f"speedup against scaled polling: {current / legacy:.1f}x")
+
+
+if __name__ == '__main__':
+    run(**parse_args())
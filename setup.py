@@ -37,15 +37,24 @@ def parse_args():
         help="Force app logging level. If you do not set this option, app logging level value from config.yaml "
         "will be loaded.")
 
+    parser.add_argument(
+        '--bootstrap',
+        dest='bootstrap',
+        action='store_true',
+        help="Store what sources currently publish as already processed, without downloading or sending anything, and "
+        "exit. Use it to start a new environment without publishing the whole back catalogue.")
+
     return vars(parser.parse_args())
 
 
 def run():
     """Run App."""
-    configuration = Configuration(**parse_args())
+    arguments = parse_args()
+    bootstrap = arguments.pop('bootstrap')
+    configuration = Configuration(**arguments)
     logging.basicConfig(level=configuration.get_global_configuration()['global_logging_level'],
                         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    app = Application(configuration=configuration)
+    app = Application(configuration=configuration, bootstrap=bootstrap)
     app.run()
 
 
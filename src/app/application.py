@@ -1,14 +1,25 @@
 """Application Module."""
 import asyncio
 import logging
+import os
 import signal
-from typing import Tuple, Dict, Union, List
+from typing import Tuple, Dict, Union, List, Optional
+
+import appdirs
 
 from src.inf.configuration.configuration import Configuration
+from src.inf.conversion_service.conversion_service import CONVERSION_SERVICE
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.outbox.outbox_entry import OutboxEntry
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.blackfire.service import BlackfireService
 from src.ser.common.enums.state import State
 from src.ser.common.receiver_mixin import ReceiverMixin
 from src.ser.common.sender_mixin import SenderMixin
+from src.ser.common.value_object.queue_data import QueueData
 from src.ser.common.value_object.task_value_object import TaskValueObject
 from src.ser.discord.service import DiscordService
 from src.ser.ws_banner.service import WSBannerService
@@ -22,6 +33,8 @@ class Application:
     """Application class. The one in charge of governing all the modules."""
     _APP_NAME = 'GabrielMessenger'
     _SLEEPING_SECONDS = 5
+    _FILES_DIRECTORY = 'files'
+    _OUTBOX_FILE = 'outbox.sqlite'
     _SENDERS: Tuple[SenderMixin] = (DiscordService, )
     _RECEIVERS: Tuple[ReceiverMixin] = (
         BlackfireService,
@@ -32,33 +45,66 @@ class Application:
         WSTournamentJp,
     )
 
-    def __init__(self, configuration: Configuration):
+    def __init__(self, configuration: Configuration, bootstrap: bool = False):
+        """In bootstrap mode, receivers only store identifiers of what sources currently publish and senders are not
+        started. Application ends when all receivers are bootstrapped."""
         self._logger = logging.getLogger(self._APP_NAME)
         self._logger.setLevel(configuration.get_global_configuration()['app_logging_level'])
         self._environment = configuration.get_global_configuration()['environment']
+        self._bootstrap = bootstrap
         self._loop = asyncio.get_event_loop()
-        self._loop.add_signal_handler(signal.SIGINT, self._clean_shutdown)
+        if not bootstrap:
+            self._loop.add_signal_handler(signal.SIGINT, self._clean_shutdown)
+        self._http_client = HttpClient(**configuration.get_global_configuration().get('http_client', {}))
+        self._scheduler = Scheduler(loop=self._loop)
+        self._parse_service = ParseService(**configuration.get_global_configuration().get('parse_service', {}))
+        self._file_store = FileStore(directory=os.path.join(appdirs.user_data_dir(self._APP_NAME),
+                                                            self._environment.value, self._FILES_DIRECTORY),
+                                     **configuration.get_global_configuration().get('file_store', {}))
+        self._outbox = Outbox(path=os.path.join(appdirs.user_data_dir(self._APP_NAME), self._environment.value,
+                                                self._OUTBOX_FILE))
+        outbox_entries = [] if bootstrap else self._loop.run_until_complete(self._outbox.load())
+        for outbox_entry in outbox_entries:
+            self._file_store.acquire(digests=outbox_entry.publication.digests)
         self._senders_repositories_instances_value_objects = self._get_senders(
-            config=configuration.get_modules()['sender'], loop=self._loop, configuration=configuration)
+            config=configuration.get_modules()['sender'],
+            loop=self._loop,
+            configuration=configuration,
+            file_store=self._file_store,
+            outbox=self._outbox,
+            start=not bootstrap)
         self._receivers_repositories_instances_value_objects = self._get_receivers(
             config=configuration.get_modules()['receiver'],
             senders=self._senders_repositories_instances_value_objects,
             logging_level=configuration.get_global_configuration()['app_logging_level'],
             loop=self._loop,
+            http_client=self._http_client,
+            file_store=self._file_store,
+            parse_service=self._parse_service,
+            scheduler=self._scheduler,
+            outbox=self._outbox,
+            bootstrap=bootstrap,
         )
+        if outbox_entries:
+            self._loop.create_task(self._replay(outbox_entries=outbox_entries))
 
-    def _get_senders(self, *, config: Dict, loop: asyncio.AbstractEventLoop,
-                     configuration: Configuration) -> Dict[str, Dict[str, TaskValueObject]]:
+    def _get_senders(self, *, config: Dict, loop: asyncio.AbstractEventLoop, configuration: Configuration,
+                     file_store: FileStore, outbox: Outbox, start: bool) -> Dict[str, Dict[str, TaskValueObject]]:
         return {
             sender_name: self._get_sender_class(sender_name=sender_name).create_tasks_from_configuration(
                 configuration=sender_config,
                 loop=loop,
-                logging_level=configuration.get_global_configuration()['app_logging_level'])
+                logging_level=configuration.get_global_configuration()['app_logging_level'],
+                file_store=file_store,
+                outbox=outbox,
+                start=start)
             for sender_name, sender_config in config.items()
         }
 
     def _get_receivers(self, *, config: dict, senders: Dict[str, Dict[str, TaskValueObject]], logging_level: str,
-                       loop: asyncio.AbstractEventLoop) -> List[TaskValueObject]:
+                       loop: asyncio.AbstractEventLoop, http_client: HttpClient, file_store: FileStore,
+                       parse_service: ParseService, scheduler: Scheduler, outbox: Outbox,
+                       bootstrap: bool) -> List[TaskValueObject]:
         tasks = []
         for receiver_name, receiver_config in config.items():
             tasks.extend(
@@ -68,9 +114,40 @@ class Application:
                     loop=loop,
                     app_name=self._APP_NAME,
                     environment=self._environment,
-                    logging_level=logging_level))
+                    logging_level=logging_level,
+                    http_client=http_client,
+                    file_store=file_store,
+                    parse_service=parse_service,
+                    scheduler=scheduler,
+                    outbox=outbox,
+                    bootstrap=bootstrap))
         return tasks
 
+    async def _replay(self, *, outbox_entries: List[OutboxEntry]):
+        """Put publications that were not delivered before last shutdown in queues of their senders. Entries of senders
+        that are no longer configured are discarded."""
+        for outbox_entry in outbox_entries:
+            sender = self._get_sender_task(sender_name=outbox_entry.sender_name, sender_id=outbox_entry.sender_id)
+            if sender is None:
+                self._logger.warning("Sender %s [%s] does not exist, outbox entry %s discarded.",
+                                     outbox_entry.sender_name, outbox_entry.sender_id, outbox_entry.entry_id)
+                self._outbox.ack(entry_id=outbox_entry.entry_id)
+                self._file_store.release(digests=outbox_entry.publication.digests)
+                continue
+            await sender.publication_queue.put(
+                QueueData(channel=outbox_entry.channel,
+                          publication=outbox_entry.publication,
+                          outbox_id=outbox_entry.entry_id))
+        if outbox_entries:
+            self._logger.info("Replayed %s publications of outbox.", len(outbox_entries))
+
+    def _get_sender_task(self, *, sender_name: str, sender_id: str) -> Optional[TaskValueObject]:
+        for key_name, task_value_object in self._senders_repositories_instances_value_objects.get(sender_name,
+                                                                                                  {}).items():
+            if str(key_name) == sender_id:
+                return task_value_object
+        return None
+
     def _get_sender_class(self, *, sender_name: str) -> SenderMixin:
         return self._get_class(tuple_class=self._SENDERS, name_class=sender_name)
 
@@ -88,8 +165,18 @@ class Application:
     def run(self):
         """Run Application. Run until complete all task of all services."""
         self._loop.run_until_complete(asyncio.gather(*asyncio.Task.all_tasks()))
+        if self._bootstrap:
+            self._loop.run_until_complete(self._clean_bootstrap())
         self._logger.info("Shutdown.")
 
+    async def _clean_bootstrap(self):
+        """Close shared services after a bootstrap. Receivers are already finished and senders were not started."""
+        await self._http_client.close()
+        await self._parse_service.close()
+        self._scheduler.close()
+        await CONVERSION_SERVICE.close()
+        self._logger.info("Bootstrap finished.")
+
     def _clean_shutdown(self):
         """Handler that will be activated when app receives a SIGINT signal. This create a task to programming a clean
         shutdown."""
@@ -102,6 +189,8 @@ class Application:
         app will be completed."""
         await self._clean_receivers()
         await self._clean_senders()
+        await self._outbox.flush()
+        await CONVERSION_SERVICE.close()
         self._logger.info("Cleaned all services.")
         return
 
@@ -113,6 +202,9 @@ class Application:
             repositories_instances_value_objects=self._receivers_repositories_instances_value_objects)
         await self._check_tasks_finished(
             repositories_instances_value_objects=self._receivers_repositories_instances_value_objects)
+        await self._http_client.close()
+        await self._parse_service.close()
+        self._scheduler.close()
         self._logger.info("Cleaned Receivers.")
 
     async def _clean_senders(self):
@@ -0,0 +1,63 @@
+"""Conversion Cache Module."""
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from src.ser.common.enums.format_data import FormatData
+
+ConversionKey = Tuple[str, FormatData, FormatData]
+
+
+class ConversionCache:
+    """Least recently used cache of conversions, by content hash, source format and target format."""
+    def __init__(self, *, max_size: int):
+        self._max_size = max_size
+        self._entries: 'OrderedDict[ConversionKey, str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(data: str, *, from_format: FormatData, to_format: FormatData) -> ConversionKey:
+        """Build key of a conversion."""
+        return hashlib.blake2b(data.encode('utf-8')).hexdigest(), from_format, to_format
+
+    def get(self, key: ConversionKey) -> Optional[str]:
+        """Return cached conversion or None if it is not cached."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def get_or_convert(self, data: str, *, from_format: FormatData, to_format: FormatData,
+                       converter: Callable[[str], str]) -> str:
+        """Return cached conversion. If it is not cached, converter is called and the result stored."""
+        key = self.get_key(data, from_format=from_format, to_format=to_format)
+        value = self.get(key)
+        if value is None:
+            value = converter(data)
+            self.put(key, value)
+        return value
+
+    def put(self, key: ConversionKey, value: str):
+        """Store a conversion and evict the least recently used entries beyond max size."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+CONVERSION_CACHE = ConversionCache(max_size=4096)
@@ -0,0 +1,108 @@
+"""Conversion Service Module."""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pypandoc
+
+from src.inf.conversion_service.conversion_cache import CONVERSION_CACHE, ConversionKey
+from src.ser.common.enums.format_data import FormatData
+from src.ser.common.html_converter import HtmlConverter
+
+_Batch = Dict[ConversionKey, Tuple[str, asyncio.Future]]
+
+
+def convert_text(data: str, *, from_format: FormatData, to_format: FormatData) -> str:
+    """Convert data natively when it is possible. Pandoc is only used as fallback for other formats."""
+    if from_format == to_format:
+        return data
+    if HtmlConverter.is_supported(from_format=from_format, to_format=to_format):
+        return HtmlConverter.convert(data, from_format=from_format, to_format=to_format)
+    return pypandoc.convert_text(data, to_format.value, format=from_format.value)
+
+
+def _convert_batch(items: List[Tuple[str, str, str]]) -> List[str]:
+    """Worker side of the service. Convert many fragments in one round trip."""
+    return [
+        convert_text(data, from_format=FormatData(from_format), to_format=FormatData(to_format))
+        for data, from_format, to_format in items
+    ]
+
+
+class ConversionService:
+    """Convert rich text in batches in a pool of worker processes. Short native conversions are done in place."""
+    _INLINE_MAX_LENGTH = 2048
+
+    def __init__(self, *, max_workers: Optional[int] = None):
+        self._max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: _Batch = {}
+        self._flush_scheduled = False
+
+    def convert(self, data: str, *, from_format: FormatData, to_format: FormatData) -> 'asyncio.Future[str]':
+        """Return an awaitable with the converted data."""
+        loop = asyncio.get_event_loop()
+        key = CONVERSION_CACHE.get_key(data, from_format=from_format, to_format=to_format)
+        if key in self._pending:
+            return self._pending[key][1]
+
+        future = loop.create_future()
+        if from_format == to_format or (len(data) <= self._INLINE_MAX_LENGTH and HtmlConverter.is_supported(
+                from_format=from_format, to_format=to_format)):
+            future.set_result(
+                CONVERSION_CACHE.get_or_convert(
+                    data,
+                    from_format=from_format,
+                    to_format=to_format,
+                    converter=lambda value: convert_text(value, from_format=from_format, to_format=to_format)))
+            return future
+
+        cached = CONVERSION_CACHE.get(key)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+
+        self._pending[key] = (data, future)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        self._flush_scheduled = False
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        keys = list(batch)
+        items = [(batch[key][0], key[1].value, key[2].value) for key in keys]
+        worker_future = asyncio.get_event_loop().run_in_executor(self._get_executor(), _convert_batch, items)
+        worker_future.add_done_callback(lambda done: self._set_results(done, keys=keys, batch=batch))
+
+    @staticmethod
+    def _set_results(done: asyncio.Future, *, keys: List[ConversionKey], batch: _Batch):
+        if done.cancelled() or done.exception():
+            error = asyncio.CancelledError() if done.cancelled() else done.exception()
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for key, result in zip(keys, done.result()):
+            CONVERSION_CACHE.put(key, result)
+            future = batch[key][1]
+            if not future.done():
+                future.set_result(result)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._executor
+
+    async def close(self):
+        """Stop worker processes."""
+        if self._executor is not None:
+            await asyncio.get_event_loop().run_in_executor(None, self._executor.shutdown)
+            self._executor = None
+
+
+CONVERSION_SERVICE = ConversionService()
@@ -0,0 +1,97 @@
+"""Dedup Index Module."""
+
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Union
+
+import sqlalchemy
+from orm.models import ModelMetaclass
+
+Identifier = Union[int, str]
+
+
+class DedupIndex:
+    """Index of identifiers already processed by a receiver. Known identifiers are cached in front of database and new
+    ones are written on flush."""
+    _DEFAULT_MAX_SIZE = 65536
+    _MAX_BATCH_SIZE = 500  # Below default SQLite limit of host parameters.
+    _SYNCHRONOUS_PRAGMA = 'PRAGMA synchronous=NORMAL'  # Safe with WAL journal, commits do not wait for checkpoints.
+
+    def __init__(self, *, model: ModelMetaclass, max_size: int = _DEFAULT_MAX_SIZE):
+        self._model = model
+        self._max_size = max_size
+        self._known: OrderedDict = OrderedDict()
+        self._pending: OrderedDict = OrderedDict()
+        self._max_id: Optional[Identifier] = None
+
+    @property
+    def max_id(self) -> Optional[Identifier]:
+        """Maximum identifier stored. None if index is empty."""
+        return self._max_id
+
+    @property
+    def pending(self) -> int:
+        """Number of identifiers waiting for next flush."""
+        return len(self._pending)
+
+    async def load(self) -> None:
+        """Read maximum identifier. This is the only query done at startup."""
+        table = self._model.__table__
+        self._max_id = await self._model.__database__.fetch_val(sqlalchemy.select([sqlalchemy.func.max(table.c.id)]))
+
+    async def contains(self, identifier: Identifier) -> bool:
+        """Check if an identifier was processed."""
+        if identifier in self._pending:
+            return True
+        if identifier in self._known:
+            self._known.move_to_end(identifier)
+            return True
+        return bool(await self._get_stored(identifiers=[identifier]))
+
+    async def filter_new(self, identifiers: Iterable[Identifier]) -> List[Identifier]:
+        """Return identifiers that were not processed, keeping their order. Unknown identifiers are looked up in
+        batches."""
+        identifiers = list(identifiers)
+        pending = list(
+            OrderedDict.fromkeys(identifier for identifier in identifiers
+                                 if identifier not in self._known and identifier not in self._pending))
+        stored = set()
+        for start in range(0, len(pending), self._MAX_BATCH_SIZE):
+            stored.update(await self._get_stored(identifiers=pending[start:start + self._MAX_BATCH_SIZE]))
+        new = set(pending) - stored
+        return [identifier for identifier in identifiers if identifier in new]
+
+    async def add(self, identifier: Identifier) -> None:
+        """Store an identifier. It is buffered until next flush, but it is known by the index from now."""
+        self._pending[identifier] = True
+        self._remember(identifier=identifier)
+
+    async def flush(self) -> None:
+        """Insert buffered identifiers in a single transaction. Identifiers stored by other instances with same table
+        are ignored."""
+        if not self._pending:
+            return
+        values = [{'id': identifier} for identifier in self._pending]
+        query = self._model.__table__.insert().prefix_with('OR IGNORE')
+        async with self._model.__database__.connection() as connection:
+            await connection.execute(self._SYNCHRONOUS_PRAGMA)
+            async with connection.transaction():
+                await connection.execute_many(query, values=values)
+        for value in values:
+            self._pending.pop(value['id'], None)
+
+    async def _get_stored(self, *, identifiers: List[Identifier]) -> List[Identifier]:
+        table = self._model.__table__
+        rows = await self._model.__database__.fetch_all(
+            sqlalchemy.select([table.c.id]).where(table.c.id.in_(identifiers)))
+        stored = [row['id'] for row in rows]
+        for identifier in stored:
+            self._remember(identifier=identifier)
+        return stored
+
+    def _remember(self, *, identifier: Identifier) -> None:
+        self._known[identifier] = True
+        self._known.move_to_end(identifier)
+        if len(self._known) > self._max_size:
+            self._known.popitem(last=False)
+        if self._max_id is None or identifier > self._max_id:
+            self._max_id = identifier
@@ -0,0 +1,18 @@
+"""Blob Value Object Module."""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class Blob:
+    """Blob value object. A file of the file store. References are publications in queues that still need it."""
+    digest: str
+    extension: str
+    size: int
+    last_access: float
+    references: int = 0
+
+    @property
+    def filename(self) -> str:
+        """Filename in file store."""
+        return f"{self.digest}.{self.extension}"
@@ -0,0 +1,106 @@
+"""File Store Module."""
+
+import logging
+import os
+import time
+import uuid
+from typing import Dict, Iterable, Optional
+
+from src.inf.file_store.blob import Blob
+
+
+class FileStore:
+    """Content addressed file store. Files are stored once by digest and evicted when they are not referenced by any
+    pending publication."""
+    _TEMPORARY_FILE_SUFFIX = '.part'
+    _MIN_AGE = 600
+
+    def __init__(self, *, directory: str, max_size: Optional[int] = None):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._directory = directory
+        self._max_size = max_size
+        self._blobs: Dict[str, Blob] = {}
+        self._size = 0
+        os.makedirs(self._directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Index files of directory. Temporary files of interrupted downloads are removed."""
+        for entry in os.scandir(self._directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(self._TEMPORARY_FILE_SUFFIX):
+                os.remove(entry.path)
+                continue
+            digest, _, extension = entry.name.partition('.')
+            stat = entry.stat()
+            self._blobs[digest] = Blob(digest=digest,
+                                       extension=extension,
+                                       size=stat.st_size,
+                                       last_access=stat.st_mtime)
+            self._size += stat.st_size
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of stored files."""
+        return self._size
+
+    def get_temporary_path(self) -> str:
+        """Get a path where a file can be written before it is put in the store."""
+        return os.path.join(self._directory, f".{uuid.uuid4().hex}{self._TEMPORARY_FILE_SUFFIX}")
+
+    def put(self, *, temporary_path: str, digest: str, extension: str) -> str:
+        """Move a temporary file into the store and return its path. If the content is already stored, temporary
+        file is removed."""
+        blob = self._blobs.get(digest)
+        if blob:
+            os.remove(temporary_path)
+            blob.last_access = time.time()
+            return self.get_path(digest=digest)
+
+        blob = Blob(digest=digest,
+                    extension=extension,
+                    size=os.path.getsize(temporary_path),
+                    last_access=time.time())
+        os.replace(temporary_path, os.path.join(self._directory, blob.filename))
+        self._blobs[digest] = blob
+        self._size += blob.size
+        self._evict()
+        return self.get_path(digest=digest)
+
+    def get_path(self, *, digest: str) -> str:
+        """Path of a stored file."""
+        return os.path.join(self._directory, self._blobs[digest].filename)
+
+    def acquire(self, *, digests: Iterable[str], count: int = 1):
+        """Add references to stored files."""
+        for digest in digests:
+            blob = self._blobs.get(digest)
+            if blob:
+                blob.references += count
+                blob.last_access = time.time()
+
+    def release(self, *, digests: Iterable[str]):
+        """Remove a reference of stored files. Files without references can be evicted."""
+        for digest in digests:
+            blob = self._blobs.get(digest)
+            if blob and blob.references:
+                blob.references -= 1
+        self._evict()
+
+    def _evict(self):
+        if self._max_size is None or self._size <= self._max_size:
+            return
+        limit = time.time() - self._MIN_AGE
+        candidates = sorted((blob for blob in self._blobs.values() if not blob.references and blob.last_access < limit),
+                            key=lambda blob: blob.last_access)
+        for blob in candidates:
+            if self._size <= self._max_size:
+                break
+            try:
+                os.remove(os.path.join(self._directory, blob.filename))
+            except FileNotFoundError:
+                pass
+            del self._blobs[blob.digest]
+            self._size -= blob.size
+            self._logger.debug("Evicted %s", blob.filename)
@@ -0,0 +1,113 @@
+"""Http Client Module."""
+
+import hashlib
+from typing import Dict, Optional
+
+import aiohttp
+
+from src.inf.http_client.response_validator import ResponseValidator
+
+
+class HttpClient:
+    """Http client of receivers. One connection pool is used for all requests and validators of responses are kept by
+    url to perform conditional requests once they are committed."""
+    _DEFAULT_LIMIT = 100
+    _DEFAULT_LIMIT_PER_HOST = 4
+    _DEFAULT_DNS_CACHE_TTL = 300
+    _DEFAULT_CONNECT_TIMEOUT = 30
+    _DEFAULT_READ_TIMEOUT = 60
+    _DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 *,
+                 limit: int = _DEFAULT_LIMIT,
+                 limit_per_host: int = _DEFAULT_LIMIT_PER_HOST,
+                 dns_cache_ttl: int = _DEFAULT_DNS_CACHE_TTL,
+                 connect_timeout: int = _DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: int = _DEFAULT_READ_TIMEOUT,
+                 keepalive_timeout: int = _DEFAULT_KEEPALIVE_TIMEOUT):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._dns_cache_ttl = dns_cache_ttl
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._validators: Dict[str, ResponseValidator] = {}
+        self._uncommitted_validators: Dict[str, ResponseValidator] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Client session. It is created the first time that is used, so it is bound to the running loop."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self._limit,
+                                             limit_per_host=self._limit_per_host,
+                                             use_dns_cache=True,
+                                             ttl_dns_cache=self._dns_cache_ttl,
+                                             keepalive_timeout=self._keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=self._get_timeout(),
+                                                  headers={'Accept-Encoding': self._get_accept_encoding()})
+        return self._session
+
+    def _get_timeout(self) -> aiohttp.ClientTimeout:
+        """Connection and each read are limited, but not the whole request, so a large download on a slow link is not
+        cut while data keeps arriving."""
+        return aiohttp.ClientTimeout(total=None, sock_connect=self._connect_timeout, sock_read=self._read_timeout)
+
+    @staticmethod
+    def _get_accept_encoding() -> str:
+        """Brotli is only accepted when aiohttp can decode it."""
+        try:
+            import brotli  # pylint: disable=import-outside-toplevel,unused-import
+        except ImportError:
+            return 'gzip, deflate'
+        return 'gzip, deflate, br'
+
+    def get(self, url: str, **kwargs):
+        """Perform a GET request. Use it as async context manager."""
+        return self.session.get(url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        """Perform a HEAD request. Use it as async context manager."""
+        return self.session.head(url, **kwargs)
+
+    async def get_if_modified(self, url: str) -> Optional[bytes]:
+        """Perform a conditional GET request with validators of last committed response of this url. Return None when
+        the server answers that it has not been modified or when the body is the same as the last committed one.
+        Validators of a successful response are kept until commit is called."""
+        validator = self._validators.get(url)
+        headers = {}
+        if validator and validator.etag:
+            headers['If-None-Match'] = validator.etag
+        if validator and validator.last_modified:
+            headers['If-Modified-Since'] = validator.last_modified
+
+        async with self.get(url, headers=headers) as resp:
+            if resp.status == 304:
+                return None
+            content = await resp.read()
+            if not 200 <= resp.status < 300:
+                return content
+            etag = resp.headers.get('ETag')
+            last_modified = resp.headers.get('Last-Modified')
+
+        digest = hashlib.blake2b(content).hexdigest()
+        self._uncommitted_validators[url] = ResponseValidator(digest=digest, etag=etag, last_modified=last_modified)
+        if validator and validator.digest == digest:
+            return None
+        return content
+
+    def commit(self, url: str):
+        """Use validators of last response of this url in next conditional requests. Call it when its content has been
+        processed."""
+        validator = self._uncommitted_validators.pop(url, None)
+        if validator is not None:
+            self._validators[url] = validator
+
+    async def close(self):
+        """Close all connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,12 @@
+"""Response Validator Value Object Module."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ResponseValidator:
+    """Response validator value object. Data of last response of a url used to know if it has changed."""
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
@@ -0,0 +1,110 @@
+"""Outbox Module."""
+
+import asyncio
+import os
+import pickle
+from typing import Any, Dict, List, Union
+
+import databases
+import sqlalchemy
+
+from src.inf.outbox.outbox_entry import OutboxEntry
+
+METADATA = sqlalchemy.MetaData()
+
+ENTRY = sqlalchemy.Table(
+    'entry',
+    METADATA,
+    sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
+    sqlalchemy.Column('sender_name', sqlalchemy.Text, nullable=False),
+    sqlalchemy.Column('sender_id', sqlalchemy.Text, nullable=False),
+    sqlalchemy.Column('payload', sqlalchemy.LargeBinary, nullable=False),
+)
+
+ACK = sqlalchemy.Table(
+    'ack',
+    METADATA,
+    sqlalchemy.Column('entry_id', sqlalchemy.Integer, primary_key=True, autoincrement=False),
+)
+
+
+class Outbox:
+    """SQLite outbox of publications. Entries are appended when a publication is queued and acknowledged when it is
+    delivered, so pending ones are replayed at startup."""
+    _DEFAULT_TIMEOUT = 30
+
+    def __init__(self, *, path: str, timeout: int = _DEFAULT_TIMEOUT):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._database = databases.Database("sqlite:///" + path, timeout=timeout)
+        engine = sqlalchemy.create_engine(str(self._database.url), connect_args={'timeout': timeout})
+        METADATA.create_all(engine, checkfirst=True)
+        with engine.connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+        self._next_id = 1
+        self._pending_entries: Dict[int, Dict[str, Any]] = {}
+        self._pending_acks: List[int] = []
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of entries and acknowledgements waiting for next flush."""
+        return len(self._pending_entries) + len(self._pending_acks)
+
+    async def load(self) -> List[OutboxEntry]:
+        """Remove delivered entries and return entries without acknowledgement, in order of creation."""
+        async with self._database.connection() as connection:
+            async with connection.transaction():
+                await connection.execute(ENTRY.delete().where(ENTRY.c.id.in_(sqlalchemy.select([ACK.c.entry_id]))))
+                await connection.execute(ACK.delete())
+            rows = await connection.fetch_all(ENTRY.select().order_by(ENTRY.c.id))
+        entries = []
+        for row in rows:
+            channel, publication = pickle.loads(row['payload'])
+            entries.append(
+                OutboxEntry(entry_id=row['id'],
+                            sender_name=row['sender_name'],
+                            sender_id=row['sender_id'],
+                            channel=channel,
+                            publication=publication))
+        if rows:
+            self._next_id = rows[-1]['id'] + 1
+        return entries
+
+    def append(self, *, sender_name: str, sender_id: str, channel: Union[str, int], publication: Any) -> int:
+        """Add an entry. It is written on next flush. Return its id."""
+        entry_id = self._next_id
+        self._next_id += 1
+        self._pending_entries[entry_id] = {
+            'id': entry_id,
+            'sender_name': sender_name,
+            'sender_id': str(sender_id),
+            'payload': pickle.dumps((channel, publication)),
+        }
+        return entry_id
+
+    def ack(self, *, entry_id: int):
+        """Acknowledge delivery of an entry. An entry that was not written yet is simply discarded."""
+        if self._pending_entries.pop(entry_id, None) is None:
+            self._pending_acks.append(entry_id)
+
+    async def flush(self):
+        """Write buffered entries and acknowledgements in one transaction. Flushes are serialized: tasks created by a
+        task that holds a connection share it, so overlapping transactions would be nested."""
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            entries, self._pending_entries = self._pending_entries, {}
+            acks, self._pending_acks = self._pending_acks, []
+            try:
+                async with self._database.connection() as connection:
+                    await connection.execute('PRAGMA synchronous=NORMAL')
+                    async with connection.transaction():
+                        if entries:
+                            await connection.execute_many(ENTRY.insert(), values=list(entries.values()))
+                        if acks:
+                            await connection.execute_many(ACK.insert().prefix_with('OR IGNORE'),
+                                                          values=[{'entry_id': entry_id} for entry_id in acks])
+            except BaseException:
+                self._pending_entries = {**entries, **self._pending_entries}
+                self._pending_acks = acks + self._pending_acks
+                raise
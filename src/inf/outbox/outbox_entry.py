@@ -0,0 +1,14 @@
+"""Outbox Entry Module."""
+
+from dataclasses import dataclass
+from typing import Any, Union
+
+
+@dataclass
+class OutboxEntry:
+    """Publication waiting in outbox to be delivered by a sender to a channel."""
+    entry_id: int
+    sender_name: str
+    sender_id: str
+    channel: Union[str, int]
+    publication: Any
@@ -0,0 +1,48 @@
+"""Parse Service Module."""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar, Union
+
+from bs4 import BeautifulSoup
+
+from src.ser.common.html_parser import HtmlParser
+from src.ser.common.value_object.html_region import HtmlRegion
+
+Record = TypeVar('Record')
+Extractor = Callable[[BeautifulSoup], Record]
+
+
+def _extract(markup: Union[str, bytes], html_parser: HtmlParser, regions: Tuple[HtmlRegion, ...],
+             extractor: Extractor) -> Record:
+    """Worker side of the service. Parse a document and extract its records."""
+    return extractor(html_parser.parse(markup, regions=regions))
+
+
+class ParseService:
+    """Parse html documents in a pool of worker processes. Extractors run in the worker, so only records come back to
+    the loop."""
+    def __init__(self, *, max_workers: Optional[int] = None):
+        self._max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def extract(self,
+                      *,
+                      markup: Union[str, bytes],
+                      html_parser: HtmlParser,
+                      extractor: Extractor,
+                      regions: Tuple[HtmlRegion, ...] = ()) -> Record:
+        """Parse a document in a worker and return records of extractor."""
+        return await asyncio.get_event_loop().run_in_executor(self._get_executor(), _extract, markup, html_parser,
+                                                              regions, extractor)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._executor
+
+    async def close(self):
+        """Stop worker processes."""
+        if self._executor is not None:
+            await asyncio.get_event_loop().run_in_executor(None, self._executor.shutdown)
+            self._executor = None
@@ -0,0 +1,26 @@
+"""Rate Limiter Module."""
+
+import asyncio
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket rate limiter. Allows bursts of "rate" calls and refills "rate" tokens each "period" seconds."""
+    def __init__(self, *, rate: int, period: float):
+        self._rate = rate
+        self._period = period
+        self._tokens = float(rate)
+        self._updated: Optional[float] = None
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            if self._updated is not None:
+                self._tokens = min(self._rate, self._tokens + (now - self._updated) * self._rate / self._period)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) * self._period / self._rate)
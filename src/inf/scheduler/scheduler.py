@@ -0,0 +1,59 @@
+"""Scheduler Module."""
+
+import asyncio
+import heapq
+import itertools
+from typing import List, Optional, Tuple
+
+
+class Scheduler:
+    """Scheduler of receiver poll deadlines. Deadlines are kept in a heap and one timer is armed at the earliest."""
+    def __init__(self, *, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline: Optional[float] = None
+
+    def wait(self, delay: float) -> asyncio.Future:
+        """Future resolved after delay seconds."""
+        return self.wait_until(self._loop.time() + delay)
+
+    def wait_until(self, deadline: float) -> asyncio.Future:
+        """Future resolved at deadline, in event loop time."""
+        future = self._loop.create_future()
+        heapq.heappush(self._heap, (deadline, next(self._counter), future))
+        self._arm()
+        return future
+
+    def _arm(self):
+        """Arm the timer at earliest pending deadline. Cancelled deadlines at the top of heap are discarded."""
+        while self._heap and self._heap[0][2].done():
+            heapq.heappop(self._heap)
+        deadline = self._heap[0][0] if self._heap else None
+        if deadline == self._timer_deadline:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._loop.call_at(deadline, self._fire) if deadline is not None else None
+        self._timer_deadline = deadline
+
+    def _fire(self):
+        self._timer = None
+        self._timer_deadline = None
+        now = self._loop.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                future.set_result(None)
+        self._arm()
+
+    def close(self):
+        """Cancel all pending deadlines."""
+        if self._timer is not None:
+            self._timer.cancel()
+        for _, _, future in self._heap:
+            future.cancel()
+        self._heap.clear()
+        self._timer = None
+        self._timer_deadline = None
@@ -0,0 +1,31 @@
+"""TTL Cache Module."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class TtlCache:
+    """Cache of awaitable results that expire after ttl seconds. Concurrent loads of the same key are shared."""
+    def __init__(self, *, ttl: float):
+        self._ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, asyncio.Future]] = {}
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Get value of a key. If it is not cached, or it expired, loader is awaited to get it."""
+        loop = asyncio.get_event_loop()
+        self._purge(now=loop.time())
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = (loop.time() + self._ttl, asyncio.ensure_future(loader()))
+            self._entries[key] = entry
+        future = entry[1]
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            raise
+
+    def _purge(self, *, now: float):
+        for key in [key for key, (expiration, _) in self._entries.items() if expiration <= now]:
+            del self._entries[key]
@@ -8,8 +8,9 @@ from src.ser.common.itf.publication import Publication
 
 @dataclass
 class BlackfirePublication(Publication):
-    """Dataclass that expand a Publication."""
+    """Dataclass that expand a Publication. Name is plain text name of product, used to sort products."""
     custom_fields: Optional[CustomFields] = None
+    name: Optional[str] = None
 
     @property
     def markdown(self):
@@ -9,3 +9,4 @@ from src.ser.common.itf.custom_config import CustomConfig
 class Config(CustomConfig):
     """Blackfire custom config."""
     search_parameters: str
+    max_concurrent_requests: int
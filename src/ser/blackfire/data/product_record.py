@@ -0,0 +1,13 @@
+"""Product record module"""
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class ProductRecord:
+    """Blackfire product data extracted from product page."""
+    name_text: str
+    name_html: str
+    description_html: str
+    image_src: str
+    description_lines: List[str]
@@ -1,24 +1,36 @@
 """Blackfire service module. This is a receiver service."""
+import asyncio
 import logging
 import re
 import urllib.parse
 from asyncio import Queue
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
+from src.inf.ttl_cache.ttl_cache import TtlCache
 from src.ser.blackfire.data.blackfire_publication import BlackfirePublication
 from src.ser.blackfire.data.config import Config
 from src.ser.blackfire.data.custom_fields import CustomFields
+from src.ser.blackfire.data.product_record import ProductRecord
 from src.ser.blackfire.models.identifier import Identifier, METADATA
 from src.ser.common.data.weiss_schwarz_barcelona_data import BrigadaSOSData
 from src.ser.common.enums.format_data import FormatData
+from src.ser.common.enums.parser_backend import ParserBackend
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.queue_manager import QueueManager
 from src.ser.common.receiver_mixin import ReceiverMixin
 from src.ser.common.rich_text import RichText
 from src.ser.common.value_object.custom_field import CustomField
+from src.ser.common.value_object.file_value_object import FileValueObject
+from src.ser.common.value_object.html_region import HtmlRegion
 from src.ser.common.value_object.transacation_data import TransactionData
 
 
@@ -36,9 +48,21 @@ class BlackfireService(ReceiverMixin, BrigadaSOSData):
     _BLACKFIRE_BASE_URL = 'https://www.blackfire.eu/{}'
     _PUBLIC_URL = True
     _FORMAT_DATA = FormatData.HTML
-
-    def __init__(self, *, files_directory: str, instance_name: str, queue_manager: QueueManager, search_parameters: str,
-                 download_files: bool, wait_time: int, logging_level: str, state_change_queue: Queue, colour: int):
+    _PARSER_BACKENDS = (ParserBackend.LXML, ParserBackend.HTML_PARSER)
+    _DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+    _PRODUCT_CACHE = TtlCache(ttl=300)  # Shorter than minimum age of unreferenced files in file store.
+    _PRODUCTS_REGIONS = (HtmlRegion(tag='div', class_name='product-list'), )
+    _PRODUCT_REGIONS = (
+        HtmlRegion(tag='h1'),
+        HtmlRegion(element_id='tab-description'),
+        HtmlRegion(element_id='image'),
+        HtmlRegion(class_name='description'),
+    )
+
+    def __init__(self, *, file_store: FileStore, instance_name: str, queue_manager: QueueManager,
+                 search_parameters: str, download_files: bool, wait_time: int, logging_level: str,
+                 state_change_queue: Queue, colour: int, max_concurrent_requests: int, http_client: HttpClient,
+                 html_parser: HtmlParser, parse_service: ParseService, scheduler: Scheduler, outbox: Outbox):
         self._instance_name = instance_name
         logger = logging.getLogger(self._instance_name)
         logger.setLevel(logging_level)
@@ -46,70 +70,99 @@ class BlackfireService(ReceiverMixin, BrigadaSOSData):
                          wait_time=wait_time,
                          state_change_queue=state_change_queue,
                          queue_manager=queue_manager,
-                         files_directory=files_directory,
-                         download_files=download_files)
+                         file_store=file_store,
+                         download_files=download_files,
+                         http_client=http_client,
+                         html_parser=html_parser,
+                         parse_service=parse_service,
+                         scheduler=scheduler,
+                         outbox=outbox)
         self._colour = colour
         self._search_parameters = search_parameters
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
 
     async def _load_publications(self) -> None:
-        html = await self._get_site_content(url=self._PRODUCTS_URL.format(self._search_parameters))
+        html = await self._get_site_content_if_modified(url=self._PRODUCTS_URL.format(self._search_parameters))
+        if html is None:
+            return
         html = html.decode('utf-8')
-        beautiful_soup = BeautifulSoup(html, 'html.parser')
-        products_bs = beautiful_soup.find('div', class_='product-list')
-        if not products_bs:
+        listed_ids = await self._extract(html, extractor=self._extract_product_ids, regions=self._PRODUCTS_REGIONS)
+        if not listed_ids:
             return
 
-        products_ids = await self._get_new_product_ids(products_bs=products_bs)
+        products_ids = await self._dedup_index.filter_new(listed_ids)
 
-        publications = []
-        for product_id in products_ids:
-            publications.append(await self._get_product(product_id=product_id))
+        publications = await asyncio.gather(*[self._get_product(product_id=product_id) for product_id in products_ids])
 
-        publications.sort(key=lambda product_item: product_item.title.to_format(format_data=FormatData.PLAIN))
+        publications.sort(key=lambda product_item: product_item.name)
         self._logger.debug("Loaded all products")
 
         for publication in publications:
             transaction_data = TransactionData(transaction_id=publication.publication_id, publications=[publication])
             await self._put_in_queue(transaction_data=transaction_data)
 
-    async def _get_new_product_ids(self, products_bs: List[Tag]):
-        products_ids = []
-        for product_bs in products_bs:
-            product_id = int(product_bs.find('a').attrs['href'].split('=')[1])
-            if product_id not in self._cache:
-                products_ids.append(product_id)
+    async def _list_identifiers(self) -> List[int]:
+        html = await self._get_site_content(url=self._PRODUCTS_URL.format(self._search_parameters))
+        return await self._extract(html.decode('utf-8'),
+                                   extractor=self._extract_product_ids,
+                                   regions=self._PRODUCTS_REGIONS)
 
-        return products_ids
+    @staticmethod
+    def _extract_product_ids(beautiful_soup: BeautifulSoup) -> List[int]:
+        """Extractor of product ids of listing page."""
+        products_bs = beautiful_soup.find('div', class_='product-list')
+        if not products_bs:
+            return []
+        return [
+            int(product_bs.find('a').attrs['href'].split('=')[1]) for product_bs in products_bs
+            if isinstance(product_bs, Tag)
+        ]
+
+    @staticmethod
+    def _extract_product(beautiful_soup: BeautifulSoup) -> ProductRecord:
+        """Extractor of product page."""
+        product_name = beautiful_soup.find('h1')
+        return ProductRecord(name_text=product_name.text,
+                             name_html=str(product_name),
+                             description_html=str(beautiful_soup.find(id='tab-description')),
+                             image_src=beautiful_soup.find(id='image').attrs['src'],
+                             description_lines=beautiful_soup.find(class_="description").text.split('\n'))
 
     async def _get_product(self, product_id: int) -> BlackfirePublication:
+        """Product pages are fetched concurrently, up to max concurrent requests of the instance. Fetched products are
+        shared by all instances for a while, so a product found by several searches is fetched once."""
         product_url = self._PRODUCT_URL.format(product_id)
-        html = await self._get_site_content(url=product_url)
-        beautiful_soup = BeautifulSoup(html, 'html.parser')
-        product_name = beautiful_soup.find('h1')
-        product_name_text = product_name.text
-        product_name_rich = str(product_name)
-        product_description_rich = str(beautiful_soup.find(id='tab-description'))
-        product_image_url = self._BLACKFIRE_BASE_URL.format(beautiful_soup.find(id='image').attrs['src'])
-        file = await self._get_file_value_object(url=product_image_url,
-                                                 public_url=self._PUBLIC_URL,
-                                                 pretty_name=product_name_text)
-        beautiful_soup_description = beautiful_soup.find(class_="description").text.split('\n')
+        product, file = await self._PRODUCT_CACHE.get_or_load(
+            product_id, lambda: self._fetch_product(product_id=product_id, product_url=product_url))
+        beautiful_soup_description = product.description_lines
         product_custom_fields_value_object = CustomFields(
             release_date=self._get_release_date(beautiful_soup_description=beautiful_soup_description),
             dead_line=self._get_dead_line(beautiful_soup_description=beautiful_soup_description),
         )
         product_value_object = BlackfirePublication(publication_id=product_id,
-                                                    title=RichText(data=product_name_rich, format_data=self._FORMAT_DATA),
-                                                    description=RichText(data=product_description_rich, format_data=self._FORMAT_DATA),
+                                                    title=RichText(data=product.name_html, format_data=self._FORMAT_DATA),
+                                                    description=RichText(data=product.description_html, format_data=self._FORMAT_DATA),
                                                     url=product_url,
                                                     timestamp=datetime.utcnow(),
                                                     color=self._colour,
                                                     images=[file],
                                                     author=self._AUTHOR,
-                                                    custom_fields=product_custom_fields_value_object)
+                                                    custom_fields=product_custom_fields_value_object,
+                                                    name=product.name_text.strip())
         return product_value_object
 
-    def _get_release_date(self, *, beautiful_soup_description: str) -> Optional[CustomField]:
+    async def _fetch_product(self, *, product_id: int, product_url: str) -> Tuple[ProductRecord, FileValueObject]:
+        async with self._semaphore:
+            self._logger.debug("Fetching product %s", product_id)
+            html = await self._get_site_content(url=product_url)
+            product = await self._extract(html, extractor=self._extract_product, regions=self._PRODUCT_REGIONS)
+            product_image_url = self._BLACKFIRE_BASE_URL.format(product.image_src)
+            file = await self._get_file_value_object(url=product_image_url,
+                                                     public_url=self._PUBLIC_URL,
+                                                     pretty_name=product.name_text)
+        return product, file
+
+    def _get_release_date(self, *, beautiful_soup_description: List[str]) -> Optional[CustomField]:
         release_date = None
         for line in beautiful_soup_description:
             if 'Release Date' in line:
@@ -117,7 +170,7 @@ class BlackfireService(ReceiverMixin, BrigadaSOSData):
                 release_date = CustomField(name='Fecha de Lanzamiento', value=date_text)
         return release_date
 
-    def _get_dead_line(self, *, beautiful_soup_description: str) -> Optional[CustomField]:
+    def _get_dead_line(self, *, beautiful_soup_description: List[str]) -> Optional[CustomField]:
         dead_line = None
         for line in beautiful_soup_description:
             if 'Order Deadline' in line:
@@ -138,6 +191,8 @@ class BlackfireService(ReceiverMixin, BrigadaSOSData):
             configurations.append(
                 Config(
                     search_parameters=urllib.parse.quote(search_text),
+                    max_concurrent_requests=configuration.get('max_concurrent_requests',
+                                                              cls._DEFAULT_MAX_CONCURRENT_REQUESTS),
                     instance_name=cls._get_instance_name(search_text),
                     queue_manager=cls._get_queue_manager(config=sender_config, senders=senders),
                 ))
@@ -0,0 +1,9 @@
+"""Overflow Policy Enum Module."""
+from enum import Enum
+
+
+class OverflowPolicy(Enum):
+    """Overflow policy enum. What a publication queue does when it is full."""
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    SPILL_TO_DISK = 'spill_to_disk'
@@ -0,0 +1,9 @@
+"""Parser Backend Enum Module."""
+from enum import Enum
+
+
+class ParserBackend(Enum):
+    """Parser backend enum. Tree builders that BeautifulSoup can use to parse html."""
+    LXML = 'lxml'
+    HTML5LIB = 'html5lib'
+    HTML_PARSER = 'html.parser'
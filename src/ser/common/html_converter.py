@@ -0,0 +1,224 @@
+"""Html Converter Module. Native converter between html and plain text or markdown."""
+
+import html
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple, Union
+
+from src.ser.common.enums.format_data import FormatData
+
+_HTML_FORMATS = (FormatData.HTML, FormatData.HTML5)
+_BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figcaption', 'figure',
+    'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'html', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+    'section', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul'
+}
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+_SKIP_TAGS = {'head', 'noscript', 'script', 'style', 'template', 'title'}
+_HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_WHITESPACE = re.compile(r'[ \t\n\r\f]+')
+_MARKDOWN_ESCAPE = re.compile(r'([\\`*_\[\]])')
+
+
+class _Node:
+    """Minimal html element. Only keeps what converters need."""
+    __slots__ = ('tag', 'attrs', 'children')
+
+    def __init__(self, tag: str, attrs: Optional[dict] = None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: List[Union['_Node', str]] = []
+
+
+class _TreeBuilder(HTMLParser):
+    """Build a lightweight tree of _Node from a html fragment. It is tolerant with unclosed tags like browsers."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Node('#root')
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _BLOCK_TAGS and tag != 'li':
+            self._close_implicit('p')
+        if tag == 'li':
+            self._close_implicit('li', stop=('ul', 'ol'))
+        node = _Node(tag, dict(attrs))
+        self._stack[-1].children.append(node)
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self._stack[-1].children.append(_Node(tag, dict(attrs)))
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].children.append(data)
+
+    def _close_implicit(self, tag: str, stop: Tuple[str, ...] = ()):
+        for index in range(len(self._stack) - 1, 0, -1):
+            current_tag = self._stack[index].tag
+            if current_tag in stop:
+                return
+            if current_tag == tag:
+                del self._stack[index:]
+                return
+
+
+class HtmlConverter:
+    """Convert html fragments to plain text or markdown without calling an external process. Only the conversions
+    that the services use are supported. Use `is_supported` before calling `convert`."""
+    def __init__(self, *, to_format: FormatData):
+        self._markdown = to_format == FormatData.MARKDOWN
+
+    @staticmethod
+    def is_supported(*, from_format: FormatData, to_format: FormatData) -> bool:
+        """Check if a conversion can be done natively."""
+        if from_format in _HTML_FORMATS:
+            return to_format in (*_HTML_FORMATS, FormatData.PLAIN, FormatData.MARKDOWN)
+        if from_format == FormatData.PLAIN:
+            return to_format in _HTML_FORMATS
+        return False
+
+    @classmethod
+    def convert(cls, data: str, *, from_format: FormatData, to_format: FormatData) -> str:
+        """Convert data between formats. Raise a ValueError if conversion is not supported."""
+        if not cls.is_supported(from_format=from_format, to_format=to_format):
+            raise ValueError(f"Conversion from {from_format.value} to {to_format.value} is not supported.")
+        if to_format in _HTML_FORMATS:
+            if from_format == FormatData.PLAIN:
+                return cls._plain_to_html(data)
+            return data
+        builder = _TreeBuilder()
+        builder.feed(data)
+        builder.close()
+        return '\n\n'.join(cls(to_format=to_format)._render_blocks(builder.root))
+
+    @staticmethod
+    def _plain_to_html(data: str) -> str:
+        paragraphs = [paragraph.strip() for paragraph in re.split(r'\n\s*\n', data) if paragraph.strip()]
+        return '\n'.join(f"<p>{'<br />'.join(html.escape(line) for line in paragraph.splitlines())}</p>"
+                         for paragraph in paragraphs)
+
+    def _render_blocks(self, node: _Node, list_level: int = 0) -> List[str]:
+        blocks: List[str] = []
+        inline: List[str] = []
+        ordinal = 1
+        for child in node.children:
+            if isinstance(child, str):
+                inline.append(self._render_text(child))
+            elif child.tag in _SKIP_TAGS:
+                continue
+            elif child.tag in _BLOCK_TAGS:
+                blocks.append(self._normalize_inline(''.join(inline)))
+                inline = []
+                if child.tag == 'li':
+                    marker = f"{ordinal}. " if node.tag == 'ol' else '- '
+                    ordinal += 1
+                    blocks.append(self._render_list_item(child, marker=marker, list_level=list_level))
+                else:
+                    blocks.extend(self._render_block(child, list_level=list_level))
+            else:
+                inline.append(self._render_inline(child))
+        blocks.append(self._normalize_inline(''.join(inline)))
+        return [block for block in blocks if block]
+
+    def _render_block(self, node: _Node, list_level: int) -> List[str]:
+        if node.tag == 'hr':
+            return ['---']
+        if node.tag == 'pre':
+            text = self._text_content(node).strip('\n')
+            return [f"```\n{text}\n```" if self._markdown else text]
+        if node.tag in _HEADING_TAGS:
+            text = self._normalize_inline(''.join(self._render_inline_children(node)))
+            if self._markdown and text:
+                return [f"{'#' * _HEADING_TAGS[node.tag]} {text}"]
+            return [text]
+        if node.tag in ('ul', 'ol'):
+            return ['\n'.join(self._render_blocks(node, list_level=list_level + 1))]
+        if node.tag == 'tr':
+            cells = [
+                self._normalize_inline(''.join(self._render_inline_children(cell))) for cell in node.children
+                if isinstance(cell, _Node) and cell.tag in ('td', 'th')
+            ]
+            return [' | '.join(cells)]
+        if node.tag in ('table', 'tbody', 'thead', 'tfoot'):
+            return ['\n'.join(self._render_blocks(node, list_level=list_level))]
+        blocks = self._render_blocks(node, list_level=list_level)
+        if node.tag == 'blockquote':
+            prefix = '> ' if self._markdown else '  '
+            return ['\n'.join(prefix + line if line else prefix.rstrip() for line in '\n\n'.join(blocks).split('\n'))]
+        return blocks
+
+    def _render_list_item(self, node: _Node, marker: str, list_level: int) -> str:
+        indent = '  ' * (list_level - 1)
+        lines = '\n'.join(self._render_blocks(node, list_level=list_level)).split('\n')
+        child_indent = indent + ' ' * len(marker)
+        child_lines = [line if line.startswith(child_indent) else child_indent + line.lstrip() for line in lines[1:]]
+        return '\n'.join([f"{indent}{marker}{lines[0].lstrip()}"] + child_lines)
+
+    def _render_inline(self, node: _Node) -> str:
+        if node.tag in _SKIP_TAGS:
+            return ''
+        if node.tag == 'br':
+            return '\\\n' if self._markdown else '\n'
+        if node.tag == 'img':
+            alt = node.attrs.get('alt') or ''
+            if self._markdown and node.attrs.get('src'):
+                return f"![{self._escape(alt)}]({node.attrs['src']})"
+            return alt
+        text = ''.join(self._render_inline_children(node))
+        if not self._markdown or not text.strip():
+            return text
+        if node.tag in ('strong', 'b'):
+            return self._wrap(text, '**')
+        if node.tag in ('em', 'i'):
+            return self._wrap(text, '*')
+        if node.tag == 'code':
+            return self._wrap(text, '`')
+        if node.tag == 'a' and node.attrs.get('href'):
+            return f"[{text.strip()}]({node.attrs['href']})"
+        return text
+
+    def _render_inline_children(self, node: _Node) -> List[str]:
+        parts = []
+        for child in node.children:
+            if isinstance(child, str):
+                parts.append(self._render_text(child))
+            elif child.tag in _BLOCK_TAGS:
+                parts.append(' ' + ''.join(self._render_inline_children(child)) + ' ')
+            else:
+                parts.append(self._render_inline(child))
+        return parts
+
+    def _render_text(self, text: str) -> str:
+        text = _WHITESPACE.sub(' ', text)
+        if self._markdown:
+            return self._escape(text)
+        return text
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        return _MARKDOWN_ESCAPE.sub(r'\\\1', text)
+
+    @staticmethod
+    def _wrap(text: str, mark: str) -> str:
+        stripped = text.strip()
+        leading = ' ' if text[:1] == ' ' else ''
+        trailing = ' ' if text[-1:] == ' ' else ''
+        return f"{leading}{mark}{stripped}{mark}{trailing}"
+
+    @classmethod
+    def _text_content(cls, node: _Node) -> str:
+        return ''.join(child if isinstance(child, str) else cls._text_content(child) for child in node.children)
+
+    @staticmethod
+    def _normalize_inline(text: str) -> str:
+        text = re.sub(r' {2,}', ' ', text)
+        return '\n'.join(line.strip() for line in text.split('\n')).strip()
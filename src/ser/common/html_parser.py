@@ -0,0 +1,48 @@
+"""Html Parser Module."""
+
+import importlib.util
+import logging
+from typing import Iterable, Tuple, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.ser.common.enums.parser_backend import ParserBackend
+from src.ser.common.value_object.html_region import HtmlRegion
+
+
+class HtmlParser:
+    """Html parser of receivers. Parses with the first installed backend of preference and, when regions are given,
+    only builds their subtrees."""
+    _MODULES = {
+        ParserBackend.LXML: 'lxml',
+        ParserBackend.HTML5LIB: 'html5lib',
+        ParserBackend.HTML_PARSER: None,
+    }
+
+    def __init__(self, *, backends: Iterable[ParserBackend]):
+        backends = tuple(backends)
+        self.backend = self.get_available_backend(backends=backends)
+        if backends and self.backend != backends[0]:
+            logging.getLogger(self.__class__.__name__).warning("%s is not installed, parsing with %s.",
+                                                               backends[0].value, self.backend.value)
+
+    @classmethod
+    def is_available(cls, *, backend: ParserBackend) -> bool:
+        """Check if library of a backend is installed. Python html.parser is always available."""
+        module = cls._MODULES[backend]
+        return module is None or importlib.util.find_spec(module) is not None
+
+    @classmethod
+    def get_available_backend(cls, *, backends: Iterable[ParserBackend]) -> ParserBackend:
+        """Get first available backend of preferences. html5lib is the last fallback."""
+        for backend in backends:
+            if cls.is_available(backend=backend):
+                return backend
+        return ParserBackend.HTML5LIB
+
+    def parse(self, markup: Union[str, bytes], regions: Tuple[HtmlRegion, ...] = ()) -> BeautifulSoup:
+        """Parse a html document. If regions are given, only elements of these regions are parsed."""
+        if regions and self.backend != ParserBackend.HTML5LIB:
+            parse_only = SoupStrainer(lambda name, attrs=None: any(region.matches(name, attrs) for region in regions))
+            return BeautifulSoup(markup, self.backend.value, parse_only=parse_only)
+        return BeautifulSoup(markup, self.backend.value)
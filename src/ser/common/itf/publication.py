@@ -26,6 +26,11 @@ class Publication(ABC):
     author: Optional[Author] = None
     custom_fields: Optional[Any] = None
 
+    @property
+    def digests(self) -> List[str]:
+        """Digests of all files of the publication that are in file store."""
+        return [file.digest for file in (*self.images, *self.files) if file.digest]
+
     @property
     def markdown(self):
         """Markdown output."""
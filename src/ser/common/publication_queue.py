@@ -0,0 +1,68 @@
+"""Publication Queue Module."""
+
+import asyncio
+import pickle
+import tempfile
+from typing import Any, Callable, Optional
+
+from src.ser.common.enums.overflow_policy import OverflowPolicy
+
+
+class PublicationQueue(asyncio.Queue):
+    """Bounded queue of a sender. When it is full, receivers block, oldest item is dropped or new items are spilled to
+    disk, depending on overflow policy."""
+    def __init__(self,
+                 *,
+                 maxsize: int = 0,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 on_drop: Optional[Callable[[Any], None]] = None):
+        super().__init__(maxsize=maxsize)
+        self._overflow_policy = overflow_policy
+        self._on_drop = on_drop
+        self._spill_file = None
+        self._spill_read_offset = 0
+        self._spilled = 0
+
+    @property
+    def spilled(self) -> int:
+        """Number of items waiting on disk."""
+        return self._spilled
+
+    async def put(self, item):
+        if self._overflow_policy == OverflowPolicy.DROP_OLDEST:
+            if self.full():
+                dropped = self.get_nowait()
+                if self._on_drop:
+                    self._on_drop(dropped)
+            self.put_nowait(item)
+        elif self._overflow_policy == OverflowPolicy.SPILL_TO_DISK:
+            if self.full() or self._spilled:
+                self._spill(item)
+            else:
+                self.put_nowait(item)
+        else:
+            await super().put(item)
+
+    def _get(self):
+        item = super()._get()
+        if self._spilled:
+            self._put(self._unspill())
+        return item
+
+    def _spill(self, item):
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+        self._spill_file.seek(0, 2)
+        pickle.dump(item, self._spill_file)
+        self._spilled += 1
+
+    def _unspill(self):
+        self._spill_file.seek(self._spill_read_offset)
+        item = pickle.load(self._spill_file)
+        self._spill_read_offset = self._spill_file.tell()
+        self._spilled -= 1
+        if not self._spilled:
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._spill_read_offset = 0
+        return item
@@ -1,8 +1,11 @@
 """Queue Manager Module."""
 
+import uuid
+from collections import Counter
 from dataclasses import dataclass
 from typing import List
 
+from src.inf.outbox.outbox import Outbox
 from src.ser.common.itf.publication import Publication
 from src.ser.common.value_object.queue_context import QueueContext
 from src.ser.common.value_object.queue_data import QueueData
@@ -13,9 +16,19 @@ class QueueManager:
     """Queue Manager. Instance will be passed a receiver service. This is the one in charge to manage queues."""
     queue_context_list: List[QueueContext]
 
-    async def put(self, publication: Publication):
+    async def put(self, publication: Publication, outbox: Outbox):
         """For item in queue context list (channel, queue) upload in the queue a QueueData
-        (channel, publication)"""
+        (channel, publication). Each one is recorded in outbox before, so it is replayed if it is not delivered."""
+        render_key = uuid.uuid4().hex
+        fan_out = Counter(id(queue_context.publication_queue) for queue_context in self.queue_context_list)
         for queue_context in self.queue_context_list:
-            queue_data = QueueData(channel=queue_context.channel, publication=publication)
+            outbox_id = outbox.append(sender_name=queue_context.sender_name,
+                                      sender_id=queue_context.sender_id,
+                                      channel=queue_context.channel,
+                                      publication=publication)
+            queue_data = QueueData(channel=queue_context.channel,
+                                   publication=publication,
+                                   outbox_id=outbox_id,
+                                   render_key=render_key,
+                                   fan_out=fan_out[id(queue_context.publication_queue)])
             await queue_context.publication_queue.put(queue_data)
@@ -6,9 +6,13 @@ from datetime import datetime
 from logging import Logger
 from typing import List, Optional
 
-from bs4.element import Tag
-
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.common.abstract.attribute import AbstractAttribute
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.itf.publication import Publication
 from src.ser.common.queue_manager import QueueManager
 from src.ser.common.receiver_mixin import ReceiverMixin
@@ -24,17 +28,22 @@ class ReceiverImagesMixin(ReceiverMixin):
     _PUBLIC_URL: bool = AbstractAttribute()
 
     # pylint: disable=too-many-arguments
-    def __init__(self, queue_manager: QueueManager, download_files: bool, files_directory: str, colour: int,
-                 author: Author, logger: Logger, wait_time: int, state_change_queue: Queue):
+    def __init__(self, queue_manager: QueueManager, download_files: bool, file_store: FileStore, colour: int,
+                 author: Author, logger: Logger, wait_time: int, state_change_queue: Queue, http_client: HttpClient,
+                 html_parser: HtmlParser, parse_service: ParseService, scheduler: Scheduler,
+                 outbox: Outbox):
         super().__init__(logger=logger,
                          wait_time=wait_time,
                          state_change_queue=state_change_queue,
                          queue_manager=queue_manager,
-                         files_directory=files_directory,
-                         download_files=download_files)
-        self._cache: List[str] = []
+                         file_store=file_store,
+                         download_files=download_files,
+                         http_client=http_client,
+                         html_parser=html_parser,
+                         parse_service=parse_service,
+                         scheduler=scheduler,
+                         outbox=outbox)
         self._download_files = download_files
-        self._files_directory = files_directory
         self._colour = colour
         self._author = author
 
@@ -42,17 +51,21 @@ class ReceiverImagesMixin(ReceiverMixin):
     async def _load_publications(self) -> None:
         raise NotImplementedError
 
+    async def _get_image_identifiers(self, *, img_srcs: List[str]) -> List[str]:
+        """Identifiers of publications of images, as they are created by _create_publication_from_img."""
+        return [await self._get_filename_from_url(url=img_src) for img_src in img_srcs]
+
     async def _create_publication_from_img(
             self,
-            img: Tag,
+            img_src: str,
             url: Optional[str] = None,
             rich_title: Optional[RichText] = None,
             check_cache: Optional = True,
     ) -> Optional[Publication]:
-        file_name = await self._get_filename_from_url(url=img.attrs['src'])
-        if file_name not in self._cache or not check_cache:
-            url = url or img.attrs['src']
-            file = await self._get_file_value_object(url=img.attrs['src'],
+        file_name = await self._get_filename_from_url(url=img_src)
+        if not check_cache or not await self._dedup_index.contains(file_name):
+            url = url or img_src
+            file = await self._get_file_value_object(url=img_src,
                                                      pretty_name=rich_title,
                                                      filename_unique=self._FILENAME_UNIQUE,
                                                      public_url=self._PUBLIC_URL)
@@ -3,14 +3,12 @@
 import asyncio
 import hashlib
 import os
-import time
 from abc import abstractmethod
 from asyncio import Queue
 from logging import Logger
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import aiofiles
-import aiohttp
 import appdirs
 import databases
 import sqlalchemy
@@ -19,19 +17,32 @@ from bs4 import BeautifulSoup
 from orm.models import ModelMetaclass
 from sqlalchemy import MetaData
 
+from src.inf.dedup_index.dedup_index import DedupIndex
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import Extractor, ParseService, Record
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.common.abstract.attribute import AbstractAttribute
 from src.ser.common.enums.environment import Environment
 from src.ser.common.enums.format_data import FormatData
+from src.ser.common.enums.parser_backend import ParserBackend
 from src.ser.common.enums.state import State
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.itf.custom_config import CustomConfig
 from src.ser.common.queue_manager import QueueManager
 from src.ser.common.service_mixin import ServiceMixin
 from src.ser.common.value_object.file_value_object import FileValueObject
+from src.ser.common.value_object.html_region import HtmlRegion
 from src.ser.common.value_object.queue_context import QueueContext
 from src.ser.common.value_object.task_value_object import TaskValueObject
 from src.ser.common.value_object.transacation_data import TransactionData
 
 
+class BootstrapError(Exception):
+    """Identifiers of a receiver cannot be listed without downloading files."""
+
+
 class ReceiverMixin(ServiceMixin):
     """Receiver Common Service Mixin. This mixin include methods required by receivers services."""
 
@@ -39,20 +50,39 @@ class ReceiverMixin(ServiceMixin):
     MODELS: List[ModelMetaclass] = AbstractAttribute()
     MODELS_METADATA: MetaData = AbstractAttribute()
     _TITLE_HTML_TAG = 'h1'
+    _PARSER_BACKENDS: Tuple[ParserBackend, ...] = (ParserBackend.LXML, ParserBackend.HTML5LIB)
+    _DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    _DEFAULT_EXTENSION = 'bin'
+    _DATABASE_TIMEOUT = 30
+    _FLUSH_SIZE = 100
 
     # pylint: disable=too-many-arguments
     def __init__(self, logger: Logger, wait_time: int, state_change_queue: Queue, queue_manager: QueueManager,
-                 files_directory: str, download_files: bool):
+                 file_store: FileStore, download_files: bool, http_client: HttpClient, html_parser: HtmlParser,
+                 parse_service: ParseService, scheduler: Scheduler, outbox: Outbox):
         self._logger = logger
         self._wait_time = wait_time
         self._state_change_queue = state_change_queue
         self._queue_manager = queue_manager
-        self._files_directory = files_directory
+        self._file_store = file_store
         self._download_files = download_files
-        self._session = aiohttp.ClientSession()
+        self._http_client = http_client
+        self._html_parser = html_parser
+        self._parse_service = parse_service
+        self._scheduler = scheduler
+        self._outbox = outbox
+        self._dedup_index = DedupIndex(model=self.MODEL_IDENTIFIER)
+        self._conditional_urls: Set[str] = set()
 
     async def _close(self):
-        await self._session.close()
+        """Release resources of the instance. Shared http client is closed by Application."""
+        await self._flush()
+
+    async def _flush(self):
+        """Write buffered data. Outbox is written before identifiers, so an identifier is never stored without the
+        entries of its publications."""
+        await self._outbox.flush()
+        await self._dedup_index.flush()
 
     @classmethod
     def _get_queue_manager(cls, config: Dict[str, dict], senders: Dict[str, Dict[str, TaskValueObject]]):
@@ -61,7 +91,9 @@ class ReceiverMixin(ServiceMixin):
             for sender_id, sender_configs in senders_configs.items():
                 for channel in sender_configs:
                     queue_context = QueueContext(channel=channel,
-                                                 publication_queue=senders[sender_name][sender_id].publication_queue)
+                                                 publication_queue=senders[sender_name][sender_id].publication_queue,
+                                                 sender_name=sender_name,
+                                                 sender_id=sender_id)
                     queue_context_list.append(queue_context)
         return QueueManager(queue_context_list=queue_context_list)
 
@@ -76,40 +108,40 @@ class ReceiverMixin(ServiceMixin):
                       environment: Environment):
         repository_directory = cls._get_repository_directory(app_name=app_name, environment=environment)
         database_file = os.path.join(repository_directory, cls._DATABASE_FILE)
-        database = databases.Database("sqlite:///" + database_file)
+        database = databases.Database("sqlite:///" + database_file, timeout=cls._DATABASE_TIMEOUT)
 
         for model in models:
             model.__database__ = database
-        engine = sqlalchemy.create_engine(str(database.url), connect_args={'timeout': 6000000})
+        engine = sqlalchemy.create_engine(str(database.url), connect_args={'timeout': cls._DATABASE_TIMEOUT})
         metadata.create_all(engine, checkfirst=True)
-
-    @classmethod
-    def _get_repository_files_directory(cls, app_name: str, environment: Environment):
-        repository_directory = cls._get_repository_directory(app_name=app_name, environment=environment)
-        files_directory = os.path.join(repository_directory, cls._FILES_DIRECTORY)
-        os.makedirs(files_directory, exist_ok=True)
-        return files_directory
+        with engine.connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')  # Journal mode is stored in database file.
 
     async def _loop_manager(self, *, wait_time: int, state_change_queue: Queue, logger: Logger) -> None:
-        start = 0
-        running = True
-        while running:
-            if (time.time() - start) > wait_time:
-                await self._load_publications()
+        """Load publications, then wait until scheduler says next load is due or a new state arrives, whatever comes
+        first. Validators of conditional requests are committed only when a load succeeds, so a failed load is retried
+        on next one."""
+        state_getter = asyncio.ensure_future(state_change_queue.get())
+        try:
+            while True:
+                self._conditional_urls.clear()
+                try:
+                    await self._load_publications()
+                finally:
+                    await self._flush()
+                for url in self._conditional_urls:
+                    self._http_client.commit(url)
                 logger.debug("Waiting %s seconds", wait_time)
-                start = time.time()
-            else:
-                await asyncio.sleep(self._WAIT_TIME)
-                logger.debug("Remains %s seconds, to execute the task.", int(wait_time - (time.time() - start)))
-
-            if state_change_queue.empty():
-                logger.debug("No new state.")
-            else:
-                new_state: State = state_change_queue.get_nowait()
-                if new_state == State.STOP:
-                    running = False
-                else:
+                due = self._scheduler.wait(wait_time)
+                await asyncio.wait((state_getter, due), return_when=asyncio.FIRST_COMPLETED)
+                if state_getter.done():
+                    due.cancel()
+                    new_state: State = state_getter.result()
+                    if new_state == State.STOP:
+                        break
                     raise NotImplementedError
+        finally:
+            state_getter.cancel()
         await self._close()
         logger.info("Shutdown")
 
@@ -117,79 +149,151 @@ class ReceiverMixin(ServiceMixin):
     async def _load_publications(self) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def _list_identifiers(self) -> List[Union[int, str]]:
+        """Identifiers of all publications that are currently published by source, as they are stored when they are
+        put in queue. Only listing pages are read. Raise BootstrapError if files would have to be downloaded."""
+        raise NotImplementedError
+
     async def _get_file_value_object(self,
                                      url: str,
                                      public_url: bool,
                                      pretty_name=None,
-                                     filename_unique=True) -> FileValueObject:
+                                     filename_unique=True,
+                                     response: Optional[ClientResponse] = None) -> FileValueObject:
+        """If response of a request already sent to url is given, file is read from its body instead of requesting url
+        again."""
         if not self._download_files:
             return FileValueObject(
                 public_url=url,
                 pretty_name=pretty_name,
             )
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                data = await resp.read()
-
+        if response is None:
+            temporary_path, digest = await self._download_file(url=url)
+        else:
+            temporary_path, digest = await self._write_response(response=response)
         filename = await self._get_filename_from_url(url)
+        extension = self._get_extension(filename=filename)
+        path = self._file_store.put(temporary_path=temporary_path, digest=digest, extension=extension)
 
         if not filename_unique:
-            hash_obj = hashlib.blake2b()
-            hash_obj.update(data)
-            filename = f"{hash_obj.hexdigest()}.{filename.split('.')[1]}"
-
-        path = os.path.join(self._files_directory, filename)
-
-        async with aiofiles.open(path, mode='wb') as file:
-            await file.write(data)
+            filename = f"{digest}.{extension}"
 
         if public_url:
             return FileValueObject(
                 path=path,
                 public_url=url,
                 pretty_name=pretty_name,
+                digest=digest,
+                name=filename,
             )
         return FileValueObject(
             path=path,
             pretty_name=pretty_name,
+            digest=digest,
+            name=filename,
         )
 
+    async def _download_file(self, *, url: str) -> Tuple[str, str]:
+        """Stream a file to a temporary file of file store while it is hashed, so file is never fully loaded in memory.
+        Return temporary path and blake2b hex digest."""
+        async with self._http_client.get(url) as resp:
+            return await self._write_response(response=resp)
+
+    async def _write_response(self, *, response: ClientResponse) -> Tuple[str, str]:
+        """Stream body of a response to a temporary file of file store while it is hashed. Return temporary path and
+        blake2b hex digest."""
+        hash_obj = hashlib.blake2b()
+        temporary_path = self._file_store.get_temporary_path()
+        try:
+            async with aiofiles.open(temporary_path, mode='wb') as file:
+                async for chunk in response.content.iter_chunked(self._DOWNLOAD_CHUNK_SIZE):
+                    hash_obj.update(chunk)
+                    await file.write(chunk)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        return temporary_path, hash_obj.hexdigest()
+
+    @classmethod
+    def _get_extension(cls, *, filename: str) -> str:
+        return filename.split('.')[1] if '.' in filename else cls._DEFAULT_EXTENSION
+
     @staticmethod
     async def _get_filename_from_url(url: str):
         return os.path.basename(url.split('?')[0])
 
     async def run(self):
         self._logger.info("Instance is working")
-        await self._load_cache()
+        await self._dedup_index.load()
         await self._loop_manager(wait_time=self._wait_time,
                                  state_change_queue=self._state_change_queue,
                                  logger=self._logger)
 
+    async def bootstrap(self):
+        """Store identifiers of all publications currently published by source, in one transaction, without fetching
+        details, downloading files or putting publications in queues. A new environment starts from here. Receivers
+        whose identifiers require downloading files are not bootstrapped."""
+        self._logger.info("Bootstrapping")
+        await self._dedup_index.load()
+        try:
+            identifiers = await self._list_identifiers()
+        except BootstrapError as error:
+            self._logger.error("Instance cannot be bootstrapped: %s", error)
+            return
+        for identifier in identifiers:
+            await self._dedup_index.add(identifier)
+        await self._flush()
+        self._logger.info("Bootstrapped %s identifiers", len(identifiers))
+
     async def _get_site_content(self, *, url) -> bytes:
         """This method get a url and return content in bytes."""
-        async with self._session.get(url) as resp:
+        async with self._http_client.get(url) as resp:
             response = await resp.read()
             return response
 
-    async def _get_site_head(self, *, url) -> ClientResponse:
-        """This method get a url and return content in bytes."""
-        async with self._session.head(url) as resp:
-            return resp
+    async def _get_site_content_if_modified(self, *, url) -> Optional[bytes]:
+        """This method get a url and return content in bytes. If content has not changed since last successful load,
+        return None."""
+        self._conditional_urls.add(url)
+        content = await self._http_client.get_if_modified(url)
+        if content is None:
+            self._logger.debug("Not modified: %s", url)
+        return content
+
+    async def _extract(self,
+                       markup: Union[str, bytes],
+                       *,
+                       extractor: Extractor,
+                       regions: Tuple[HtmlRegion, ...] = ()) -> Record:
+        """Parse a html document with the parser backend of the service in parse service and return records of
+        extractor. If regions are given, only these regions are parsed."""
+        return await self._parse_service.extract(markup=markup,
+                                                 html_parser=self._html_parser,
+                                                 extractor=extractor,
+                                                 regions=regions)
 
     @classmethod
-    def create_tasks_from_configuration(cls, *, configuration, senders, loop, app_name, environment, logging_level):
+    def create_tasks_from_configuration(cls, *, configuration, senders, loop, app_name, environment, logging_level,
+                                        http_client, file_store, parse_service, scheduler, outbox, bootstrap=False):
         """Application will call this method to create tasks or only one task of each receiver service.
-        Application is the responsible to pass all necessary information or configuration to create these tasks."""
+        Application is the responsible to pass all necessary information or configuration to create these tasks.
+        In bootstrap mode, tasks only bootstrap their instances."""
         cls._set_database(models=cls.MODELS, metadata=cls.MODELS_METADATA, app_name=app_name, environment=environment)
-        files_directory = cls._get_repository_files_directory(app_name=app_name, environment=environment)
 
         service_global_config = {
             'colour': configuration['colour'],
             'wait_time': configuration['wait_time'],
             'download_files': configuration['download_files'],
-            'files_directory': files_directory,
+            'file_store': file_store,
             'logging_level': logging_level,
+            'http_client': http_client,
+            'html_parser': cls._get_html_parser(configuration=configuration),
+            'parse_service': parse_service,
+            'scheduler': scheduler,
+            'outbox': outbox,
         }
 
         service_instances_config = cls._get_custom_configuration(configuration=configuration, senders=senders)
@@ -198,11 +302,12 @@ class ReceiverMixin(ServiceMixin):
 
         for service_instance_config in service_instances_config:
             state_change_queue = Queue()
-            task = loop.create_task(cls(
+            instance = cls(
                 **service_global_config,
                 **service_instance_config.__dict__,
                 state_change_queue=state_change_queue,
-            ).run(),
+            )
+            task = loop.create_task(instance.bootstrap() if bootstrap else instance.run(),
                                     name=service_instance_config.instance_name)
             instance_value_objects.append(
                 TaskValueObject(
@@ -213,8 +318,12 @@ class ReceiverMixin(ServiceMixin):
 
         return instance_value_objects
 
-    async def _load_cache(self) -> None:
-        self._cache = [announcement.id for announcement in await self.MODEL_IDENTIFIER.objects.all()]
+    @classmethod
+    def _get_html_parser(cls, *, configuration: dict) -> HtmlParser:
+        """Parser backend can be forced with "parser" option in configuration of the service."""
+        if configuration.get('parser'):
+            return HtmlParser(backends=(ParserBackend(configuration['parser']), ))
+        return HtmlParser(backends=cls._PARSER_BACKENDS)
 
     @classmethod
     @abstractmethod
@@ -225,10 +334,12 @@ class ReceiverMixin(ServiceMixin):
 
     async def _put_in_queue(self, transaction_data: TransactionData):
         for publication in transaction_data.publications:
-            await self._queue_manager.put(publication=publication)
+            self._file_store.acquire(digests=publication.digests, count=len(self._queue_manager.queue_context_list))
+            await self._queue_manager.put(publication=publication, outbox=self._outbox)
             self._logger.info("New publication: %s", await self._get_format_data(data=publication.title, format_data=FormatData.PLAIN))
-        await self.MODEL_IDENTIFIER.objects.create(id=transaction_data.transaction_id)
-        self._cache.append(transaction_data.transaction_id)
+        await self._dedup_index.add(transaction_data.transaction_id)
+        if self._dedup_index.pending >= self._FLUSH_SIZE:
+            await self._flush()
 
     @staticmethod
     def _add_html_tag(string: str, tag: str):
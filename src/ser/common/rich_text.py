@@ -1,6 +1,9 @@
-import pypandoc
+from typing import Dict, Tuple
 
+from src.inf.conversion_service.conversion_cache import CONVERSION_CACHE
+from src.inf.conversion_service.conversion_service import CONVERSION_SERVICE, convert_text
 from src.ser.common.enums.format_data import FormatData
+from src.ser.common.html_converter import HtmlConverter
 
 
 class NotAllowedFormatError(Exception):
@@ -11,9 +14,47 @@ class RichText:
     _STORAGE_FORMAT = FormatData.HTML
 
     def __init__(self, data: str, format_data: FormatData):
-        self._data: str = pypandoc.convert_text(data, self._STORAGE_FORMAT.value, format=format_data.value)
+        self._source = data
+        self._source_format = format_data
+        self._formats: Dict[FormatData, str] = {}
 
     def to_format(self, *, format_data: FormatData) -> str:
-        if format_data == self._STORAGE_FORMAT:
-            return self._data
-        return pypandoc.convert_text(self._data, format_data.value, format=self._STORAGE_FORMAT.value).strip()
+        """Get text in a format. Conversion is done first time a format is requested, then it is reused."""
+        if format_data not in self._formats:
+            if self._needs_storage(format_data=format_data):
+                self.to_format(format_data=self._STORAGE_FORMAT)
+            data, from_format = self._get_conversion_origin(format_data=format_data)
+            self._set_format(format_data=format_data,
+                             data=CONVERSION_CACHE.get_or_convert(
+                                 data,
+                                 from_format=from_format,
+                                 to_format=format_data,
+                                 converter=lambda value: convert_text(
+                                     value, from_format=from_format, to_format=format_data)))
+        return self._formats[format_data]
+
+    async def to_format_async(self, *, format_data: FormatData) -> str:
+        """Same as to_format, but conversion is done by conversion service, so event loop is not blocked."""
+        if format_data not in self._formats:
+            if self._needs_storage(format_data=format_data):
+                await self.to_format_async(format_data=self._STORAGE_FORMAT)
+            data, from_format = self._get_conversion_origin(format_data=format_data)
+            self._set_format(format_data=format_data,
+                             data=await CONVERSION_SERVICE.convert(data, from_format=from_format,
+                                                                   to_format=format_data))
+        return self._formats[format_data]
+
+    def _needs_storage(self, *, format_data: FormatData) -> bool:
+        """Source is converted directly when it is possible, otherwise it is converted through storage format."""
+        return format_data not in (self._STORAGE_FORMAT, self._source_format) and not HtmlConverter.is_supported(
+            from_format=self._source_format, to_format=format_data)
+
+    def _get_conversion_origin(self, *, format_data: FormatData) -> Tuple[str, FormatData]:
+        if self._needs_storage(format_data=format_data):
+            return self._formats[self._STORAGE_FORMAT], self._STORAGE_FORMAT
+        return self._source, self._source_format
+
+    def _set_format(self, *, format_data: FormatData, data: str):
+        if format_data != self._STORAGE_FORMAT:
+            data = data.strip()
+        self._formats[format_data] = data
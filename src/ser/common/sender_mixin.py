@@ -1,12 +1,17 @@
 """Sender Mixin Module"""
 
 import asyncio
+import logging
 from abc import abstractmethod
 from asyncio import Queue, QueueEmpty, Task
 from logging import Logger
 from typing import Optional
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.outbox.outbox import Outbox
+from src.ser.common.enums.overflow_policy import OverflowPolicy
 from src.ser.common.enums.state import State
+from src.ser.common.publication_queue import PublicationQueue
 from src.ser.common.rich_text import RichText
 from src.ser.common.service_mixin import ServiceMixin
 from src.ser.common.value_object.queue_data import QueueData
@@ -15,48 +20,95 @@ from src.ser.common.value_object.task_value_object import TaskValueObject
 
 class SenderMixin(ServiceMixin):
     """Sender Common Service Mixin. This mixin include methods required by senders services."""
-    async def _loop_manager(self, *, state_change_queue: Queue, logger: Logger, publication_queue: Queue):
+    _DEFAULT_MAX_QUEUE_SIZE = 0  # Unbounded unless "max_queue_size" is configured.
+
+    async def _loop_manager(self, *, state_change_queue: Queue, logger: Logger, publication_queue: Queue,
+                            file_store: FileStore, outbox: Outbox):
+        """Wait for a publication or a new state, whatever comes first. Publications are sent as soon as they arrive
+        and bursts are drained before waiting again. Acknowledgements are written to outbox after each burst, so a
+        crash does not replay publications already delivered. On stop, publications already queued are sent before
+        closing."""
+        state_getter = asyncio.ensure_future(state_change_queue.get())
+        publication_getter = asyncio.ensure_future(publication_queue.get())
+        try:
+            while True:
+                await asyncio.wait((state_getter, publication_getter), return_when=asyncio.FIRST_COMPLETED)
+                if publication_getter.done():
+                    await self._send(queue_data=publication_getter.result(), file_store=file_store, outbox=outbox)
+                    await self._drain(publication_queue=publication_queue, file_store=file_store, outbox=outbox)
+                    await self._flush_outbox(outbox=outbox, logger=logger)
+                    publication_getter = asyncio.ensure_future(publication_queue.get())
+                    continue
+
+                new_state: State = state_getter.result()
+                if new_state != State.STOP:
+                    raise NotImplementedError
+                publication_getter.cancel()
+                await self._drain(publication_queue=publication_queue, file_store=file_store, outbox=outbox)
+                await self._close()
+                await self._flush_outbox(outbox=outbox, logger=logger)
+                logger.info("Shutdown.")
+                return
+        finally:
+            state_getter.cancel()
+            publication_getter.cancel()
+
+    async def _drain(self, *, publication_queue: Queue, file_store: FileStore, outbox: Outbox):
+        """Send all publications that are in queue without waiting for more."""
         while True:
             try:
                 queue_data: QueueData = publication_queue.get_nowait()
-                await self._load_publication(queue_data=queue_data)
             except QueueEmpty:
-                logger.debug("No publications.")
-                try:
-                    new_state: State = state_change_queue.get_nowait()
-                    if new_state == State.STOP:
-                        await self._close()
-                        logger.info("Shutdown.")
-                        return
-                    raise NotImplementedError
-                except QueueEmpty:
-                    logger.debug("No new state.")
+                return
+            await self._send(queue_data=queue_data, file_store=file_store, outbox=outbox)
+
+    async def _send(self, *, queue_data: QueueData, file_store: FileStore, outbox: Outbox):
+        """Send a publication and acknowledge it in outbox. Publications that fail are replayed on next start."""
+        try:
+            await self._load_publication(queue_data=queue_data)
+            if queue_data.outbox_id is not None:
+                outbox.ack(entry_id=queue_data.outbox_id)
+        finally:
+            file_store.release(digests=queue_data.publication.digests)
 
-            await asyncio.sleep(self._WAIT_TIME)
+    @staticmethod
+    async def _flush_outbox(*, outbox: Outbox, logger: Logger):
+        """Write acknowledgements to outbox. If it fails, they are kept and written on next flush."""
+        try:
+            await outbox.flush()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Acknowledgements could not be written to outbox.")
 
     @abstractmethod
     async def _load_publication(self, *, queue_data) -> None:
         raise NotImplementedError
 
     @classmethod
-    def create_tasks_from_configuration(cls, *, configuration, loop, logging_level):
+    def create_tasks_from_configuration(cls, *, configuration, loop, logging_level, file_store, outbox, start=True):
         """Application will call this method to create tasks or only one task of each sender service. Application is the
-        responsible to pass all necessary information or configuration to create these tasks."""
+        responsible to pass all necessary information or configuration to create these tasks. If start is false, only
+        queues are created and senders are not started."""
         repository_instances_value_objects = {}
         for key_name, configuration_item in configuration.items():
-            publication_queue = Queue()
-            state_change_queue = Queue()
-
             instance_name = cls._get_instance_name(key_name)
+            publication_queue = cls._get_publication_queue(configuration_item=configuration_item,
+                                                           instance_name=instance_name,
+                                                           file_store=file_store,
+                                                           outbox=outbox)
+            state_change_queue = Queue()
 
-            task = cls._create_task_from_configuration_custom(
-                configuration_item=configuration_item,
-                instance_name=instance_name,
-                loop=loop,
-                publication_queue=publication_queue,
-                state_change_queue=state_change_queue,
-                logging_level=logging_level,
-            )
+            task = None
+            if start:
+                task = cls._create_task_from_configuration_custom(
+                    configuration_item=configuration_item,
+                    instance_name=instance_name,
+                    loop=loop,
+                    publication_queue=publication_queue,
+                    state_change_queue=state_change_queue,
+                    logging_level=logging_level,
+                    file_store=file_store,
+                    outbox=outbox,
+                )
 
             repository_instances_value_objects[key_name] = TaskValueObject(name=instance_name,
                                                                            state_change_queue=state_change_queue,
@@ -64,12 +116,32 @@ class SenderMixin(ServiceMixin):
                                                                            task=task)
         return repository_instances_value_objects
 
+    @classmethod
+    def _get_publication_queue(cls, *, configuration_item: dict, instance_name: str,
+                               file_store: FileStore, outbox: Outbox) -> PublicationQueue:
+        """Publication queue is unbounded unless "max_queue_size" option is set, then "overflow_policy" option chooses
+        what happens when it is full. Dropped publications are acknowledged in outbox, so they are not replayed, and
+        their files are released."""
+        logger = logging.getLogger(instance_name)
+
+        def on_drop(queue_data: QueueData):
+            logger.warning("Queue is full, publication dropped: %s", queue_data.publication.publication_id)
+            if queue_data.outbox_id is not None:
+                outbox.ack(entry_id=queue_data.outbox_id)
+            file_store.release(digests=queue_data.publication.digests)
+
+        return PublicationQueue(maxsize=configuration_item.get('max_queue_size', cls._DEFAULT_MAX_QUEUE_SIZE),
+                                overflow_policy=OverflowPolicy(
+                                    configuration_item.get('overflow_policy', OverflowPolicy.BLOCK.value)),
+                                on_drop=on_drop)
+
     # pylint: disable=too-many-arguments
     @classmethod
     @abstractmethod
     def _create_task_from_configuration_custom(cls, configuration_item: dict, instance_name: str,
                                                loop: asyncio.AbstractEventLoop, publication_queue: Queue,
-                                               state_change_queue: Queue, logging_level: str) -> Task:
+                                               state_change_queue: Queue, logging_level: str,
+                                               file_store: FileStore, outbox: Outbox) -> Task:
         """Generate Task for a item in configuration."""
         raise NotImplementedError
 
@@ -12,8 +12,6 @@ class ServiceMixin:
     """Common Service Mixin. This class includes methods that required by senders services and receivers services."""
     MODULE = NotImplementedError  # type: str
     _DATABASE_FILE = "db.sqlite"
-    _FILES_DIRECTORY = 'files'
-    _WAIT_TIME = 5
 
     @classmethod
     def _get_instance_name(cls, *args):
@@ -29,5 +27,5 @@ class ServiceMixin:
     @staticmethod
     async def _get_format_data(data: Optional[RichText], format_data) -> Optional[str]:
         if data:
-            return data.to_format(format_data=format_data)
+            return await data.to_format_async(format_data=format_data)
         return data
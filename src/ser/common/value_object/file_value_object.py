@@ -7,10 +7,13 @@ from typing import Optional
 @dataclass
 class FileValueObject:
     """This value object is abstraction how app need to interact with a file. It's possible that is only available on
-    file system or a public url."""
+    file system or a public url. Files on file system are stored in file store, path is resolved by file store and
+    digest identifies the content."""
     public_url: str = None
     path: Optional[str] = None
     pretty_name: str = None
+    digest: Optional[str] = None
+    name: Optional[str] = None
 
     @property
     def pretty_filename(self):
@@ -26,6 +29,8 @@ class FileValueObject:
     @property
     def filename(self):
         """Filename of file with extension."""
+        if self.name:
+            return self.name
         if self.path:
             return os.path.basename(self.path)
         return os.path.basename(self.public_url).split('?')[0]
@@ -0,0 +1,28 @@
+"""Html Region Value Object Module."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class HtmlRegion:
+    """Html region value object. Describes an element of a page that a receiver reads, so the parser only needs to
+    build its subtree. Each field that is fulfilled must match."""
+    tag: Optional[str] = None
+    class_name: Optional[str] = None
+    element_id: Optional[str] = None
+
+    def matches(self, name: str, attrs: Optional[dict] = None) -> bool:
+        """Check if a start tag, with raw attributes, is this region."""
+        attrs = attrs or {}
+        if self.tag and name != self.tag:
+            return False
+        if self.element_id and attrs.get('id') != self.element_id:
+            return False
+        if self.class_name:
+            classes = attrs.get('class') or ''
+            if isinstance(classes, str):
+                classes = classes.split()
+            if self.class_name not in classes:
+                return False
+        return True
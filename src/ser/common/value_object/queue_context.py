@@ -8,6 +8,8 @@ from typing import Union
 @dataclass
 class QueueContext:
     """Queue Context Value Object. This will be passed to receivers services to know a what queues will need to send
-    data."""
+    data. Sender name and sender id identify the sender of the queue in outbox."""
     publication_queue: Queue
     channel: Union[str, int]
+    sender_name: str
+    sender_id: str
@@ -1,6 +1,7 @@
 """Queue Data Value Object Module."""
 
 from dataclasses import dataclass
+from typing import Optional
 
 from src.ser.common.itf.publication import Publication
 
@@ -8,6 +9,12 @@ from src.ser.common.itf.publication import Publication
 @dataclass
 class QueueData:
     """Queue data value object. This value object contains all data that will put in a queue. Receivers put this value
-    object in the queue. Sender service get this data and will upload this publication in the designated channel."""
+    object in the queue. Sender service get this data and will upload this publication in the designated channel.
+    Outbox id is the entry that sender acknowledges when publication is delivered. Render key identifies a put of a
+    publication and fan out is how many queue data of that put are in same queue, so senders can render publication
+    once for all of them."""
     channel: int
     publication: Publication
+    outbox_id: Optional[int] = None
+    render_key: Optional[str] = None
+    fan_out: int = 1
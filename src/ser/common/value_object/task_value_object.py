@@ -11,8 +11,9 @@ class TaskValueObject:
     task. State Change Queue is a Queue used to change state of the instance, for example stop the task. Publication
     Queue is queue used by:
         receiver: will put publications (receivers not create a Queue but use Senders queue)
-        sender: will get publications of this Queue."""
+        sender: will get publications of this Queue.
+    Task is None when instance is not started."""
     name: str
-    task: Task
+    task: Optional[Task]
     state_change_queue: Queue
     publication_queue: Optional[Queue] = None
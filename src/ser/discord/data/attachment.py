@@ -0,0 +1,13 @@
+"""Attachment Value Object."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Attachment:
+    """Attachment Value Object. A file of file store that is uploaded to Discord. Digest identifies its content, so its
+    url can be reused."""
+    path: str
+    filename: str
+    digest: Optional[str] = None
@@ -0,0 +1,10 @@
+"""Attachment Url Value Object."""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class AttachmentUrl:
+    """Attachment Url Value Object. Url of an uploaded file and time, as unix timestamp, until it can be reused."""
+    url: str
+    expires_at: float
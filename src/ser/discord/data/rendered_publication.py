@@ -0,0 +1,16 @@
+"""Rendered Publication Value Object."""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import discord
+
+from src.ser.discord.data.attachment import Attachment
+
+
+@dataclass
+class RenderedPublication:
+    """Rendered Publication Value Object. Messages of a publication, ready to be sent to any channel."""
+    embeds: List[discord.Embed]
+    attachment: Optional[Attachment] = None
+    extras: List[Attachment] = field(default_factory=list)
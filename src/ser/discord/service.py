@@ -3,19 +3,30 @@ import asyncio
 import logging
 import re
 import textwrap
+import time
+import urllib.parse
 from asyncio import Queue, AbstractEventLoop, Task
-from typing import Dict, Any, List
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 
+import aiohttp
 import discord
 from discord import File
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.outbox.outbox import Outbox
+from src.inf.rate_limiter.rate_limiter import RateLimiter
 from src.ser.common.enums.format_data import FormatData
+from src.ser.common.itf.publication import Publication
 from src.ser.common.sender_mixin import SenderMixin
 from src.ser.common.value_object.queue_data import QueueData
+from src.ser.discord.data.attachment import Attachment
+from src.ser.discord.data.attachment_url import AttachmentUrl
 from src.ser.discord.data.bot_config import BotConfig
 from src.ser.discord.data.channel_config import ChannelConfig
 from src.ser.discord.data.reaction_change_config import ReactionChangeConfig
 from src.ser.discord.data.reaction_config import ReactionConfig
+from src.ser.discord.data.rendered_publication import RenderedPublication
 from src.ser.discord.data.reporting_channel_config import ReportingChannelConfig
 
 
@@ -24,9 +35,21 @@ class DiscordService(discord.Client, SenderMixin):
     MODULE = 'Discord'
     _MAX_DESCRIPTION_LENGTH = 2000
     _FORMAT_DATA = FormatData.PLAIN
+    _CHANNEL_RATE = 5  # Messages per channel each _CHANNEL_PERIOD seconds.
+    _CHANNEL_PERIOD = 5
+    _GLOBAL_RATE = 50  # Requests of bot each _GLOBAL_PERIOD seconds.
+    _GLOBAL_PERIOD = 1
+    _DISPATCH_QUEUE_SIZE = 10
+    _RENDER_CACHE_SIZE = 256
+    _ATTACHMENT_CACHE_SIZE = 1024
+    _ATTACHMENT_URL_TTL = 12 * 60 * 60  # Signed urls of Discord CDN expire after 24 hours.
+    _ATTACHMENT_URL_EXPIRY_MARGIN = 60 * 60
+    _URL_CHECK_TIMEOUT = 10
+    _SEND_ATTEMPTS = 5
+    _RETRY_DELAY = 2  # Seconds before first retry, doubled after each failed attempt.
 
     def __init__(self, *, instance_name: str, config: BotConfig, loop: AbstractEventLoop, publication_queue: Queue,
-                 state_change_queue: Queue, logging_level: str):
+                 state_change_queue: Queue, logging_level: str, file_store: FileStore, outbox: Outbox):
         discord.Client.__init__(self, loop=loop)
 
         self._instance_name = instance_name
@@ -37,6 +60,17 @@ class DiscordService(discord.Client, SenderMixin):
         self._channels: Dict[int, discord.TextChannel] = {}
         self._publication_queue = publication_queue
         self._state_change_queue = state_change_queue
+        self._file_store = file_store
+        self._outbox = outbox
+        self._dispatch_queues: Dict[int, Queue] = {}
+        self._dispatch_tasks: List[Task] = []
+        self._channel_rate_limiters: Dict[int, RateLimiter] = {}
+        self._global_rate_limiter = RateLimiter(rate=self._GLOBAL_RATE, period=self._GLOBAL_PERIOD)
+        self._renders: OrderedDict = OrderedDict()
+        self._renders_remaining: Dict[str, int] = {}
+        self._attachment_urls: OrderedDict = OrderedDict()
+        self._attachment_locks: Dict[str, asyncio.Lock] = {}
+        self._url_session: Optional[aiohttp.ClientSession] = None
 
     async def on_ready(self):
         """On ready: create tasks"""
@@ -47,13 +81,16 @@ class DiscordService(discord.Client, SenderMixin):
                 state_change_queue=self._state_change_queue,
                 logger=self._logger,
                 publication_queue=self._publication_queue,
+                file_store=self._file_store,
+                outbox=self._outbox,
             ))
 
     # pylint: disable=too-many-arguments
     @classmethod
     def _create_task_from_configuration_custom(cls, configuration_item: dict, instance_name: str,
                                                loop: asyncio.AbstractEventLoop, publication_queue: Queue,
-                                               state_change_queue: Queue, logging_level: str) -> Task:
+                                               state_change_queue: Queue, logging_level: str,
+                                               file_store: FileStore, outbox: Outbox) -> Task:
         bot_config = BotConfig(activity=cls._get_activity(activity_configuration=configuration_item['activity']),
                                channels_config=cls._get_channels_config(channels_config=configuration_item['channels']),
                                clean_channels=configuration_item['clean_channels'],
@@ -65,6 +102,8 @@ class DiscordService(discord.Client, SenderMixin):
             publication_queue=publication_queue,
             state_change_queue=state_change_queue,
             logging_level=logging_level,
+            file_store=file_store,
+            outbox=outbox,
         )
         return loop.create_task(discord_instance.start(configuration_item['token']), name=instance_name)
 
@@ -105,70 +144,243 @@ class DiscordService(discord.Client, SenderMixin):
             for reaction, reaction_config in config.items()
         }
 
+    async def _send(self, *, queue_data: QueueData, file_store: FileStore, outbox: Outbox):
+        """Publications are sent by a dispatcher of their channel, so channels are served concurrently and order is
+        kept inside each channel. Dispatcher queues are bounded, so a slow channel holds publication queue back."""
+        queue = self._dispatch_queues.get(queue_data.channel)
+        if queue is None:
+            queue = Queue(maxsize=self._DISPATCH_QUEUE_SIZE)
+            self._dispatch_queues[queue_data.channel] = queue
+            self._dispatch_tasks.append(
+                self.loop.create_task(self._dispatch(queue=queue, file_store=file_store, outbox=outbox)))
+        await queue.put(queue_data)
+
+    async def _dispatch(self, *, queue: Queue, file_store: FileStore, outbox: Outbox):
+        """Send publications of a channel in order. Acknowledgements are written to outbox when channel queue is
+        empty, so a crash does not replay publications already delivered."""
+        while True:
+            queue_data: QueueData = await queue.get()
+            try:
+                await super()._send(queue_data=queue_data, file_store=file_store, outbox=outbox)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception("Publication could not be sent to channel %s, it is sent again on next start.",
+                                       queue_data.channel)
+            try:
+                if queue.empty():
+                    await self._flush_outbox(outbox=outbox, logger=self._logger)
+            finally:
+                queue.task_done()
+
+    async def _send_message(self, *, channel: discord.TextChannel, **kwargs) -> discord.Message:
+        """Send a message when rate limits of channel and bot allow it, so Discord does not answer with a 429."""
+        rate_limiter = self._channel_rate_limiters.get(channel.id)
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(rate=self._CHANNEL_RATE, period=self._CHANNEL_PERIOD)
+            self._channel_rate_limiters[channel.id] = rate_limiter
+        await rate_limiter.acquire()
+        await self._global_rate_limiter.acquire()
+        return await channel.send(**kwargs)
+
     async def _load_publication(self, *, queue_data: QueueData) -> None:
+        """Transient errors of Discord are retried with exponential backoff, so publications are not left for the next
+        restart. Messages of the publication already sent are sent again on retry."""
         channel = await self._get_channel(channel_id=queue_data.channel)
+        try:
+            rendered = await self._get_rendered(queue_data=queue_data)
+        finally:
+            self._release_rendered(queue_data=queue_data)
+
+        delay = self._RETRY_DELAY
+        for attempt in range(1, self._SEND_ATTEMPTS + 1):
+            try:
+                await self._send_rendered(channel=channel, rendered=rendered)
+                return
+            except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as error:
+                if attempt == self._SEND_ATTEMPTS or not self._is_transient(error=error):
+                    raise
+                self._logger.warning("Sending to channel %s failed (%s), retrying in %s seconds.", queue_data.channel,
+                                     error, delay)
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    @staticmethod
+    def _is_transient(*, error: Exception) -> bool:
+        """Errors of Discord servers, rate limits and connection errors can succeed later. Other answers of Discord, as
+        missing permissions, will not."""
+        if isinstance(error, discord.HTTPException):
+            return error.status >= 500 or error.status == 429
+        return True
+
+    async def _send_rendered(self, *, channel: discord.TextChannel, rendered: RenderedPublication):
+        for embed in rendered.embeds[:-1]:
+            await self._send_message(channel=channel, embed=embed, file=None)
+        if rendered.attachment:
+            await self._send_embed_image(channel=channel, attachment=rendered.attachment, embed=rendered.embeds[-1])
+        else:
+            await self._send_message(channel=channel, embed=rendered.embeds[-1], file=None)
+
+        for attachment in rendered.extras:
+            await self._upload_attachment(channel=channel, attachment=attachment)
+
+    async def _send_embed_image(self, *, channel: discord.TextChannel, attachment: Attachment, embed: discord.Embed):
+        """Send an embed with a file as image. A file is uploaded once, then url of the uploaded copy is used for other
+        channels and later sends while it has not expired and it still answers, otherwise file is uploaded again."""
+        if attachment.digest is None:
+            await self._upload_attachment(channel=channel, attachment=attachment, embed=embed)
+            return
+        async with self._attachment_locks.setdefault(attachment.digest, asyncio.Lock()):
+            url = self._get_attachment_url(digest=attachment.digest)
+            if url is not None and not await self._is_url_available(url=url):
+                self._logger.info("Url of %s is not available, uploading it again.", attachment.filename)
+                self._attachment_urls.pop(attachment.digest, None)
+                url = None
+            if url is None:
+                await self._upload_attachment(channel=channel, attachment=attachment, embed=embed)
+                return
+
+        embed = discord.Embed.from_dict(embed.to_dict())
+        embed.set_image(url=url)
+        await self._send_message(channel=channel, embed=embed)
+
+    async def _is_url_available(self, *, url: str) -> bool:
+        try:
+            async with self._get_url_session().head(url) as resp:
+                return resp.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    def _get_url_session(self) -> aiohttp.ClientSession:
+        if self._url_session is None:
+            self._url_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self._URL_CHECK_TIMEOUT))
+        return self._url_session
 
-        description_chunks = await self._get_description_chunks(queue_data=queue_data)
-        i = 1
-        file = None
-        for description_chunk in description_chunks:
+    def _get_attachment_url(self, *, digest: str) -> Optional[str]:
+        """Url of an uploaded file with this digest, if it has not expired."""
+        attachment_url: Optional[AttachmentUrl] = self._attachment_urls.get(digest)
+        if attachment_url is None:
+            return None
+        if attachment_url.expires_at <= time.time():
+            del self._attachment_urls[digest]
+            return None
+        self._attachment_urls.move_to_end(digest)
+        return attachment_url.url
+
+    @classmethod
+    def _get_attachment_url_expiration(cls, *, url: str) -> float:
+        """Signed urls of Discord CDN include their expiration as a hexadecimal timestamp in "ex" parameter. Urls are
+        reused until a margin before it, and never longer than ttl."""
+        expires_at = time.time() + cls._ATTACHMENT_URL_TTL
+        expiration = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get('ex')
+        if expiration:
+            try:
+                expires_at = min(expires_at, int(expiration[0], 16) - cls._ATTACHMENT_URL_EXPIRY_MARGIN)
+            except ValueError:
+                pass
+        return expires_at
+
+    async def _upload_attachment(self,
+                                 *,
+                                 channel: discord.TextChannel,
+                                 attachment: Attachment,
+                                 embed: Optional[discord.Embed] = None):
+        if embed:
+            embed = discord.Embed.from_dict(embed.to_dict())
+            embed.set_image(url=f"attachment://{attachment.filename}")
+        message = await self._send_message(channel=channel,
+                                           embed=embed,
+                                           file=File(attachment.path, filename=attachment.filename))
+        if attachment.digest is None or not embed:
+            return
+        url = None
+        if message.embeds and message.embeds[0].image.url:
+            url = message.embeds[0].image.url
+        elif message.attachments:
+            url = message.attachments[0].url
+        if url:
+            self._attachment_urls[attachment.digest] = AttachmentUrl(
+                url=url, expires_at=self._get_attachment_url_expiration(url=url))
+            while len(self._attachment_urls) > self._ATTACHMENT_CACHE_SIZE:
+                digest, _ = self._attachment_urls.popitem(last=False)
+                self._attachment_locks.pop(digest, None)
+
+    async def _get_rendered(self, *, queue_data: QueueData) -> RenderedPublication:
+        """Publication is rendered once for all channels of the same put. Renders are kept until all of them are
+        served, or until they are the least recently used of a full cache."""
+        if queue_data.render_key is None:
+            return await self._render(publication=queue_data.publication)
+        render = self._renders.get(queue_data.render_key)
+        if render is None:
+            render = self.loop.create_task(self._render(publication=queue_data.publication))
+            self._renders[queue_data.render_key] = render
+            self._renders_remaining[queue_data.render_key] = queue_data.fan_out
+            while len(self._renders) > self._RENDER_CACHE_SIZE:
+                render_key, _ = self._renders.popitem(last=False)
+                self._renders_remaining.pop(render_key, None)
+        else:
+            self._renders.move_to_end(queue_data.render_key)
+        return await asyncio.shield(render)
+
+    def _release_rendered(self, *, queue_data: QueueData):
+        if queue_data.render_key not in self._renders_remaining:
+            return
+        self._renders_remaining[queue_data.render_key] -= 1
+        if self._renders_remaining[queue_data.render_key] <= 0:
+            del self._renders_remaining[queue_data.render_key]
+            del self._renders[queue_data.render_key]
+
+    async def _render(self, *, publication: Publication) -> RenderedPublication:
+        title = await self._get_format_data(data=publication.title, format_data=self._FORMAT_DATA)
+        description_chunks = await self._get_description_chunks(publication=publication)
+        rendered = RenderedPublication(embeds=[])
+        for i, description_chunk in enumerate(description_chunks, start=1):
             embed = discord.Embed(
-                title=await self._get_format_data(data=queue_data.publication.title, format_data=self._FORMAT_DATA),
+                title=title,
                 description=description_chunk,
-                url=queue_data.publication.url,
-                colour=queue_data.publication.color,
+                url=publication.url,
+                colour=publication.color,
             )
-            if queue_data.publication.timestamp:
-                embed.timestamp = queue_data.publication.timestamp
+            if publication.timestamp:
+                embed.timestamp = publication.timestamp
 
-            if queue_data.publication.author:
-                embed.set_author(name=queue_data.publication.author.name,
-                                 url=queue_data.publication.author.url,
-                                 icon_url=queue_data.publication.author.icon_url)
+            if publication.author:
+                embed.set_author(name=publication.author.name,
+                                 url=publication.author.url,
+                                 icon_url=publication.author.icon_url)
 
             if i == 1:
-                if queue_data.publication.custom_fields:
-                    for field in queue_data.publication.custom_fields:
+                if publication.custom_fields:
+                    for field in publication.custom_fields:
                         if field:
                             embed.add_field(name=field.name, value=field.value)
 
             if i == len(description_chunks):
-                if queue_data.publication.images:
-                    if queue_data.publication.images[0].public_url:
-                        embed.set_image(url=queue_data.publication.images[0].public_url)
+                if publication.images:
+                    if publication.images[0].public_url:
+                        embed.set_image(url=publication.images[0].public_url)
                     else:
-                        pretty_name = await self._clean_file_name(
-                            string=queue_data.publication.images[0].pretty_filename)
+                        pretty_name = await self._clean_file_name(string=publication.images[0].pretty_filename)
                         embed.set_image(url=f"attachment://{pretty_name}")
-                        file = File(queue_data.publication.images[0].path, filename=pretty_name)
+                        rendered.attachment = Attachment(path=publication.images[0].path,
+                                                         filename=pretty_name,
+                                                         digest=publication.images[0].digest)
 
-            await channel.send(embed=embed, file=file)
-            i += 1
-        await self._send_extras(queue_data=queue_data, channel=channel)
+            rendered.embeds.append(embed)
 
-    async def _get_description_chunks(self, queue_data) -> List[str]:
-        if queue_data.publication.description:
-            description = queue_data.publication.description.to_format(format_data=self._FORMAT_DATA)
-        else:
-            description = ''
+        for publication_file in (*publication.images[1:], *publication.files):
+            pretty_name = await self._clean_file_name(string=publication_file.pretty_filename)
+            rendered.extras.append(
+                Attachment(path=publication_file.path, filename=pretty_name, digest=publication_file.digest))
+        return rendered
+
+    async def _get_description_chunks(self, *, publication: Publication) -> List[str]:
+        description = await self._get_format_data(data=publication.description,
+                                                  format_data=self._FORMAT_DATA) or ''
         description_chunks = textwrap.wrap(description, width=self._MAX_DESCRIPTION_LENGTH, replace_whitespace=False)
         if not description_chunks:
             description_chunks = [None]
 
         return description_chunks
 
-    async def _send_extras(self, queue_data: QueueData, channel: discord.TextChannel):
-        if queue_data.publication.images:
-            for image in queue_data.publication.images[1:]:
-                pretty_name = await self._clean_file_name(string=image.pretty_filename)
-                file = File(image.path, filename=pretty_name)
-                await channel.send(file=file)
-
-        for publication_file in queue_data.publication.files:
-            pretty_name = await self._clean_file_name(string=publication_file.pretty_filename)
-            file = File(publication_file.path, filename=pretty_name)
-            await channel.send(file=file)
-
     async def _get_channel(self, *, channel_id) -> discord.TextChannel:
         channel = self._channels.get(channel_id)
         if not channel:
@@ -179,6 +391,12 @@ class DiscordService(discord.Client, SenderMixin):
         return channel
 
     async def _close(self):
+        await asyncio.gather(*[queue.join() for queue in self._dispatch_queues.values()])
+        for task in self._dispatch_tasks:
+            task.cancel()
+        await self._flush_outbox(outbox=self._outbox, logger=self._logger)
+        if self._url_session is not None:
+            await self._url_session.close()
         await self.logout()
 
     async def on_message(self, message):
@@ -2,15 +2,23 @@
 
 import logging
 from asyncio import Queue
+from typing import List
 
 from bs4 import BeautifulSoup
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.common.data.weiss_schwarz_barcelona_data import BrigadaSOSData
 from src.ser.common.enums.format_data import FormatData
 from src.ser.common.enums.language import Language
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.queue_manager import QueueManager
 from src.ser.common.receiver_images_mixin import ReceiverImagesMixin
 from src.ser.common.rich_text import RichText
+from src.ser.common.value_object.html_region import HtmlRegion
 from src.ser.common.value_object.transacation_data import TransactionData
 from src.ser.ws_banner.data.config import Config
 from src.ser.ws_banner.models.identifier import METADATA, Identifier
@@ -22,6 +30,7 @@ class WSBannerService(ReceiverImagesMixin, BrigadaSOSData):
     _EN_URL = 'https://en.ws-tcg.com'
     _JP_URL = 'https://ws-tcg.com'
     _TITLE = "{} Edition - Banner"
+    _REGIONS = (HtmlRegion(tag='div', class_name='slide-banner'), )
 
     MODELS = (Identifier, )
     MODEL_IDENTIFIER = Identifier
@@ -29,8 +38,10 @@ class WSBannerService(ReceiverImagesMixin, BrigadaSOSData):
 
     _PUBLIC_URL = True
 
-    def __init__(self, *, files_directory: str, instance_name: str, queue_manager: QueueManager, language: Language,
-                 download_files: bool, wait_time: int, logging_level: str, state_change_queue: Queue, colour: int):
+    def __init__(self, *, file_store: FileStore, instance_name: str, queue_manager: QueueManager, language: Language,
+                 download_files: bool, wait_time: int, logging_level: str, state_change_queue: Queue, colour: int,
+                 http_client: HttpClient, html_parser: HtmlParser, parse_service: ParseService,
+                 scheduler: Scheduler, outbox: Outbox):
         self._instance_name = instance_name
         logger = logging.getLogger(self._instance_name)
         logger.setLevel(logging_level)
@@ -48,26 +59,42 @@ class WSBannerService(ReceiverImagesMixin, BrigadaSOSData):
         super().__init__(
             queue_manager=queue_manager,
             download_files=download_files,
-            files_directory=files_directory,
+            file_store=file_store,
             colour=colour,
             author=self._AUTHOR,
             logger=logger,
             wait_time=wait_time,
             state_change_queue=state_change_queue,
+            http_client=http_client,
+            html_parser=html_parser,
+            parse_service=parse_service,
+            scheduler=scheduler,
+            outbox=outbox,
         )
 
     async def _load_publications(self):
-        html = await self._get_site_content(url=self._url)
-        beautiful_soap = BeautifulSoup(html, 'html5lib')
-        banners = beautiful_soap.findAll('div', class_='slide-banner')[0].findAll('img')
+        html = await self._get_site_content_if_modified(url=self._url)
+        if html is None:
+            return
+        banners = await self._extract(html, extractor=self._extract_banners, regions=self._REGIONS)
 
         for banner in banners:
-            publication = await self._create_publication_from_img(img=banner, url=self._url, rich_title=self._title)
+            publication = await self._create_publication_from_img(img_src=banner, url=self._url, rich_title=self._title)
             if publication:
                 transaction_data = TransactionData(transaction_id=publication.publication_id,
                                                    publications=[publication])
                 await self._put_in_queue(transaction_data=transaction_data)
 
+    async def _list_identifiers(self) -> List[str]:
+        html = await self._get_site_content(url=self._url)
+        banners = await self._extract(html, extractor=self._extract_banners, regions=self._REGIONS)
+        return await self._get_image_identifiers(img_srcs=banners)
+
+    @staticmethod
+    def _extract_banners(beautiful_soap: BeautifulSoup) -> List[str]:
+        """Extractor of banner image urls."""
+        return [img.attrs['src'] for img in beautiful_soap.findAll('div', class_='slide-banner')[0].findAll('img')]
+
     @classmethod
     def _get_custom_configuration(cls, *, configuration, senders):
         configurations = []
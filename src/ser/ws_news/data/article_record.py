@@ -0,0 +1,11 @@
+"""Article Record Module."""
+
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class ArticleRecord:
+    """Article extracted from news page. Description without scripts and urls of its images."""
+    description_html: str
+    image_urls: List[str]
@@ -0,0 +1,11 @@
+"""News Custom Config Module."""
+
+from dataclasses import dataclass
+
+from src.ser.common.itf.custom_config import CustomConfig
+
+
+@dataclass
+class Config(CustomConfig):
+    """News custom config."""
+    max_concurrent_requests: int
@@ -0,0 +1,12 @@
+"""News Record Module."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class NewsRecord:
+    """News entry extracted from news listing page."""
+    href: str
+    title: str
+    image_src: Optional[str]
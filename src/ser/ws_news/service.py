@@ -1,22 +1,33 @@
 """Weiß Schwarz - News Module."""
 
+import asyncio
 import logging
 import re
 import urllib.parse
 from asyncio import Queue
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Union
 
-from bs4 import BeautifulSoup, element
+from bs4 import BeautifulSoup
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.common.data.weiss_schwarz_barcelona_data import BrigadaSOSData
 from src.ser.common.enums.format_data import FormatData
-from src.ser.common.itf.custom_config import CustomConfig
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.itf.publication import Publication
 from src.ser.common.queue_manager import QueueManager
 from src.ser.common.receiver_mixin import ReceiverMixin
 from src.ser.common.rich_text import RichText
+from src.ser.common.value_object.file_value_object import FileValueObject
+from src.ser.common.value_object.html_region import HtmlRegion
 from src.ser.common.value_object.transacation_data import TransactionData
+from src.ser.ws_news.data.article_record import ArticleRecord
+from src.ser.ws_news.data.config import Config
+from src.ser.ws_news.data.news_record import NewsRecord
 from src.ser.ws_news.models.identifier import Identifier, METADATA
 
 
@@ -29,17 +40,23 @@ class WSNews(ReceiverMixin, BrigadaSOSData):
     _NETLOC = 'en.ws-tcg.com'
     _PUBLIC_URL = True
     _FILENAME_UNIQUE = True
+    _NEWS_REGIONS = (HtmlRegion(tag='ul', class_name='info-list'), )
+    _ARTICLE_REGIONS = (HtmlRegion(class_name='entry-content'), )
     MODEL_IDENTIFIER = Identifier
     MODELS = (Identifier, )
     MODELS_METADATA = METADATA
+    _HTML_CONTENT_TYPE = 'text/html'
+    _DEFAULT_MAX_CONCURRENT_REQUESTS = 4
     _BANNED_ALT = (
         "FB_icon",
         "IG_icon",
         "Twitter_icon"
     )
 
-    def __init__(self, *, files_directory: str, instance_name: str, queue_manager: QueueManager, download_files: bool,
-                 wait_time: int, logging_level: str, state_change_queue: Queue, colour: int):
+    def __init__(self, *, file_store: FileStore, instance_name: str, queue_manager: QueueManager, download_files: bool,
+                 wait_time: int, logging_level: str, state_change_queue: Queue, colour: int,
+                 max_concurrent_requests: int, http_client: HttpClient, html_parser: HtmlParser,
+                 parse_service: ParseService, scheduler: Scheduler, outbox: Outbox):
         self._instance_name = instance_name
         logger = logging.getLogger(self._instance_name)
         logger.setLevel(logging_level)
@@ -47,64 +64,89 @@ class WSNews(ReceiverMixin, BrigadaSOSData):
                          wait_time=wait_time,
                          state_change_queue=state_change_queue,
                          queue_manager=queue_manager,
-                         files_directory=files_directory,
-                         download_files=download_files)
+                         file_store=file_store,
+                         download_files=download_files,
+                         http_client=http_client,
+                         html_parser=html_parser,
+                         parse_service=parse_service,
+                         scheduler=scheduler,
+                         outbox=outbox)
         self._colour = colour
         self._queue_manager = queue_manager
         self._download_files = download_files
-        self._files_directory = files_directory
-        self._cache: List[int] = []
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
 
     async def _load_publications(self):
+        """News are processed concurrently, but they are put in queues in order of site."""
+        html = await self._get_site_content_if_modified(url=self._URL)
+        if html is None:
+            return
+        news = await self._extract(html, extractor=self._extract_news, regions=self._NEWS_REGIONS)
+
+        news_by_url: Dict[str, NewsRecord] = {}
+        for new in news:
+            news_by_url.setdefault(self._get_new_url(new=new), new)
+        urls = await self._dedup_index.filter_new(news_by_url)
+
+        publications = await asyncio.gather(*[self._get_new_new(new=news_by_url[url], url=url) for url in urls])
 
+        for publication in publications:
+            transaction_data = TransactionData(transaction_id=publication.publication_id, publications=[publication])
+            await self._put_in_queue(transaction_data=transaction_data)
+
+    async def _list_identifiers(self) -> List[str]:
         html = await self._get_site_content(url=self._URL)
-        beautiful_soap = BeautifulSoup(html, 'html5lib')
-        news = beautiful_soap.find('ul', class_='info-list').find_all('li')
+        news = await self._extract(html, extractor=self._extract_news, regions=self._NEWS_REGIONS)
+        return [self._get_new_url(new=new) for new in news]
+
+    def _get_new_url(self, *, new: NewsRecord) -> str:
+        return urllib.parse.urljoin(self._DOMAIN, new.href)
+
+    @staticmethod
+    def _extract_news(beautiful_soap: BeautifulSoup) -> List[NewsRecord]:
+        """Extractor of news entries of listing page."""
+        news = []
+        for new in beautiful_soap.find('ul', class_='info-list').find_all('li'):
+            img = new.find('img')
+            news.append(
+                NewsRecord(href=new.find('a').attrs['href'],
+                           title=new.find(class_='title').text.strip(),
+                           image_src=img.attrs['src'] if img else None))
+        return news
 
-        for new in news:
-            publication = await self._get_new_new(new=new)
-            if publication:
-                transaction_data = TransactionData(transaction_id=publication.publication_id,
-                                                   publications=[publication])
-                await self._put_in_queue(transaction_data=transaction_data)
-
-    async def _get_new_new(self, new: element.Tag) -> Optional[Publication]:
-        url: str = new.find('a').attrs['href']
-        parsed_url = urllib.parse.urlparse(url)
+    @classmethod
+    def _extract_article(cls, beautiful_soap: BeautifulSoup) -> ArticleRecord:
+        """Extractor of article page."""
+        data = beautiful_soap.find(class_='entry-content')
+        img_urls = []
+        for img_tag in data.find_all('img'):
+            if 'alt' in img_tag.attrs:
+                if img_tag.attrs['alt'] in cls._BANNED_ALT:
+                    continue
+            img_url = img_tag.attrs['src'].split('?')[0]
+            if img_url not in img_urls:
+                img_urls.append(img_url)
+        for script in data.find_all('script'):
+            script.decompose()
+        return ArticleRecord(description_html=str(data), image_urls=img_urls)
+
+    async def _get_new_new(self, *, new: NewsRecord, url: str) -> Publication:
         images = []
         files = []
-        if not parsed_url.netloc:
-            url = urllib.parse.urljoin(self._DOMAIN, url)
-            parsed_url = urllib.parse.urlparse(url)
-
-        if url in self._cache:
-            return
-
-        title_str = new.find(class_='title').text.strip()
+        title_str = new.title
         title_rich = RichText(data=self._add_html_tag(string=str(title_str), tag=self._TITLE_HTML_TAG),
                               format_data=FormatData.HTML)
         description = None
-        if self._NETLOC == parsed_url.netloc:
-            headers = await self._get_site_head(url=url)
-            if headers.content_type == 'text/html':
-                beautiful_soap = BeautifulSoup(await self._get_site_content(url=url), 'html5lib')
-                data = beautiful_soap.find(class_='entry-content')
-                description = await self._get_description(data=data)
-                images = await self._get_images(data=data, title=title_str)
-
+        if self._NETLOC == urllib.parse.urlparse(url).netloc:
+            content = await self._get_new_content(url=url, title=title_str)
+            if isinstance(content, ArticleRecord):
+                description = RichText(data=content.description_html, format_data=FormatData.HTML)
+                images = await self._get_images(img_urls=content.image_urls, title=title_str)
             else:
-                file = await self._get_file_value_object(url=url,
-                                                         pretty_name=title_str,
-                                                         filename_unique=self._FILENAME_UNIQUE,
-                                                         public_url=self._PUBLIC_URL)
-                files.append(file)
+                files.append(content)
 
         else:
-            file = await self._get_file_value_object(url=new.find('img').attrs['src'].split('?')[0],
-                                                     pretty_name=title_str,
-                                                     filename_unique=self._FILENAME_UNIQUE,
-                                                     public_url=self._PUBLIC_URL)
-            images.append(file)
+            images.append(await self._get_file(url=new.image_src.split('?')[0], title=title_str))
 
         return Publication(
             publication_id=url,
@@ -118,35 +160,31 @@ class WSNews(ReceiverMixin, BrigadaSOSData):
             author=self._AUTHOR,
         )
 
-    async def _get_images(self, data: element, title: str) -> element:
-        images = []
-        img_urls = []
-        img_tags = data.find_all('img')
-        for img_tag in img_tags:
-            if 'alt' in img_tag.attrs:
-                if img_tag.attrs['alt'] in self._BANNED_ALT:
-                    continue
-            img_url = img_tag.attrs['src'].split('?')[0]
-            if img_url in img_urls:
-                continue
-            img_urls.append(img_url)
-            if not urllib.parse.urlparse(img_url).netloc:
-                img_url = urllib.parse.urljoin(self._DOMAIN, img_url)
-            image = await self._get_file_value_object(url=img_url,
-                                                      pretty_name=title,
-                                                      filename_unique=self._FILENAME_UNIQUE,
-                                                      public_url=self._PUBLIC_URL)
-            images.append(image)
-        return images
-
-    async def _get_description(self, data: element) -> RichText:
-        data = RichText(data=str(await self._remove_non_text_tags(data=data)), format_data=FormatData.HTML)
-        return data
-
-    async def _remove_non_text_tags(self, data: element) -> element:
-        for script in data.find_all('script'):
-            script.decompose()
-        return data
+    async def _get_new_content(self, *, url: str, title: str) -> Union[ArticleRecord, FileValueObject]:
+        """Request url once. Html pages are returned as an article and anything else as a file, streamed from same
+        response. Content type is known from headers, so body is only read once."""
+        async with self._semaphore:
+            async with self._http_client.get(url) as resp:
+                if resp.content_type != self._HTML_CONTENT_TYPE:
+                    return await self._get_file_value_object(url=url,
+                                                             pretty_name=title,
+                                                             filename_unique=self._FILENAME_UNIQUE,
+                                                             public_url=self._PUBLIC_URL,
+                                                             response=resp)
+                html = await resp.read()
+        return await self._extract(html, extractor=self._extract_article, regions=self._ARTICLE_REGIONS)
+
+    async def _get_images(self, img_urls: List[str], title: str) -> List[FileValueObject]:
+        """Images are downloaded concurrently and returned in order of article."""
+        return list(await asyncio.gather(
+            *[self._get_file(url=urllib.parse.urljoin(self._DOMAIN, img_url), title=title) for img_url in img_urls]))
+
+    async def _get_file(self, *, url: str, title: str) -> FileValueObject:
+        async with self._semaphore:
+            return await self._get_file_value_object(url=url,
+                                                     pretty_name=title,
+                                                     filename_unique=self._FILENAME_UNIQUE,
+                                                     public_url=self._PUBLIC_URL)
 
     async def _clean_text(self, text):
         text = text.strip()
@@ -157,7 +195,9 @@ class WSNews(ReceiverMixin, BrigadaSOSData):
     @classmethod
     def _get_custom_configuration(cls, *, configuration, senders):
         configurations = [
-            CustomConfig(
+            Config(
+                max_concurrent_requests=configuration.get('max_concurrent_requests',
+                                                          cls._DEFAULT_MAX_CONCURRENT_REQUESTS),
                 instance_name=cls._get_instance_name(),
                 queue_manager=cls._get_queue_manager(config=configuration['send'], senders=senders),
             )
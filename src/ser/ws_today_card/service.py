@@ -5,18 +5,24 @@ import os
 import urllib.parse
 from asyncio import Queue
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from bs4 import BeautifulSoup
-from bs4.element import Tag
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.common.data.weiss_schwarz_barcelona_data import BrigadaSOSData
 from src.ser.common.enums.format_data import FormatData
 from src.ser.common.enums.language import Language
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.itf.publication import Publication
 from src.ser.common.queue_manager import QueueManager
-from src.ser.common.receiver_mixin import ReceiverMixin
+from src.ser.common.receiver_mixin import BootstrapError, ReceiverMixin
 from src.ser.common.rich_text import RichText
+from src.ser.common.value_object.html_region import HtmlRegion
 from src.ser.common.value_object.transacation_data import TransactionData
 from src.ser.ws_today_card.data.config import Config
 from src.ser.ws_today_card.models.identifier import Identifier, METADATA
@@ -33,9 +39,12 @@ class WSTodayCard(ReceiverMixin, BrigadaSOSData):
     MODELS = (Identifier, )
     MODELS_METADATA = METADATA
     _TITLE = "{} Edition - Today's Card"
+    _REGIONS = (HtmlRegion(tag='div', class_name='entry-content'), )
 
-    def __init__(self, *, files_directory: str, instance_name: str, queue_manager: QueueManager, language: Language,
-                 download_files: bool, wait_time: int, logging_level: str, state_change_queue: Queue, colour: int):
+    def __init__(self, *, file_store: FileStore, instance_name: str, queue_manager: QueueManager, language: Language,
+                 download_files: bool, wait_time: int, logging_level: str, state_change_queue: Queue, colour: int,
+                 http_client: HttpClient, html_parser: HtmlParser, parse_service: ParseService,
+                 scheduler: Scheduler, outbox: Outbox):
         self._instance_name = instance_name
         logger = logging.getLogger(self._instance_name)
         logger.setLevel(logging_level)
@@ -43,11 +52,15 @@ class WSTodayCard(ReceiverMixin, BrigadaSOSData):
                          wait_time=wait_time,
                          state_change_queue=state_change_queue,
                          queue_manager=queue_manager,
-                         files_directory=files_directory,
-                         download_files=download_files)
+                         file_store=file_store,
+                         download_files=download_files,
+                         http_client=http_client,
+                         html_parser=html_parser,
+                         parse_service=parse_service,
+                         scheduler=scheduler,
+                         outbox=outbox)
         self._colour = colour
         self._download_files = download_files
-        self._files_directory = files_directory
         self._title = self._TITLE.format(language.value)
         if language == Language.ENGLISH:
             self._url = self._EN_URL
@@ -59,35 +72,54 @@ class WSTodayCard(ReceiverMixin, BrigadaSOSData):
             raise NotImplementedError
 
     async def _load_publications(self):
+        """Listing page is always read: today's cards reuse their filename every day, so a new card can be published
+        without any change in the page."""
         html = await self._get_site_content(url=self._url)
-        beautiful_soap = BeautifulSoup(html, 'html5lib')
-        cards = beautiful_soap.find('div', class_='entry-content').findAll('img')
+        cards = await self._extract(html, extractor=self._extract_cards, regions=self._REGIONS)
 
         for card in cards:
-            publication = await self._get_new_cards(card=card)
+            publication = await self._get_new_cards(card_src=card)
             if publication:
                 transaction_data = TransactionData(transaction_id=publication.publication_id,
                                                    publications=[publication])
                 await self._put_in_queue(transaction_data=transaction_data)
 
-    async def _get_new_cards(self, card: Tag) -> Optional[Publication]:
-        file_name = os.path.basename(card.attrs['src'])
+    async def _list_identifiers(self) -> List[str]:
+        """Today's cards with a stored copy are identified by digest of their content. Their filename is reused every
+        day and no header identifies their content, so they cannot be listed without downloading them."""
+        html = await self._get_site_content(url=self._url)
+        identifiers = []
+        for card_src in await self._extract(html, extractor=self._extract_cards, regions=self._REGIONS):
+            file_name = await self._get_filename_from_url(url=card_src)
+            if 'ws_today_' in file_name and self._download_files:
+                raise BootstrapError("today's cards are identified by their content when files are downloaded, "
+                                     "disable download_files or start without bootstrap.")
+            identifiers.append(file_name)
+        return identifiers
+
+    @staticmethod
+    def _extract_cards(beautiful_soap: BeautifulSoup) -> List[str]:
+        """Extractor of card image urls."""
+        return [img.attrs['src'] for img in beautiful_soap.find('div', class_='entry-content').findAll('img')]
+
+    async def _get_new_cards(self, card_src: str) -> Optional[Publication]:
+        file_name = os.path.basename(card_src)
         file_name: str = file_name.split('?')[0]
         file = None
 
         if 'ws_today_' in file_name:
-            file = await self._get_file_value_object(url=card.attrs['src'],
+            file = await self._get_file_value_object(url=card_src,
                                                      pretty_name=self._title,
                                                      filename_unique=False,
                                                      public_url=False)
 
             file_name = file.filename
 
-        if file_name in self._cache:
+        if await self._dedup_index.contains(file_name):
             return None
 
         if file is None:
-            file = await self._get_file_value_object(url=urllib.parse.urljoin(self._domain, card.attrs['src']),
+            file = await self._get_file_value_object(url=urllib.parse.urljoin(self._domain, card_src),
                                                      pretty_name=self._title,
                                                      public_url=True)
         rich_title = RichText(data=self._add_html_tag(self._title, self._TITLE_HTML_TAG), format_data=FormatData.HTML)
@@ -0,0 +1,11 @@
+"""Month Record Module."""
+
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class MonthRecord:
+    """Month record extracted from events page. Title of month and urls of its tournament cards."""
+    title: str
+    image_sources: List[str]
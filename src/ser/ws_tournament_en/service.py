@@ -2,16 +2,25 @@
 
 import logging
 from asyncio import Queue
+from typing import List
 
 from bs4 import BeautifulSoup
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.common.data.weiss_schwarz_barcelona_data import BrigadaSOSData
 from src.ser.common.enums.format_data import FormatData
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.itf.custom_config import CustomConfig
 from src.ser.common.queue_manager import QueueManager
 from src.ser.common.receiver_images_mixin import ReceiverImagesMixin
 from src.ser.common.rich_text import RichText
+from src.ser.common.value_object.html_region import HtmlRegion
 from src.ser.common.value_object.transacation_data import TransactionData
+from src.ser.ws_tournament_en.data.month_record import MonthRecord
 from src.ser.ws_tournament_en.models.identifier import Identifier, METADATA
 
 
@@ -25,40 +34,62 @@ class WSTournamentEn(ReceiverImagesMixin, BrigadaSOSData):
     MODELS_METADATA = METADATA
 
     _EN_URL = 'https://en.ws-tcg.com/events/'
+    _REGIONS = (HtmlRegion(tag='div', class_name='monthWrap'), )
 
     _PUBLIC_URL = True
 
-    def __init__(self, *, files_directory: str, instance_name: str, queue_manager: QueueManager, download_files: bool,
-                 wait_time: int, logging_level: str, state_change_queue: Queue, colour: int):
+    def __init__(self, *, file_store: FileStore, instance_name: str, queue_manager: QueueManager, download_files: bool,
+                 wait_time: int, logging_level: str, state_change_queue: Queue, colour: int,
+                 http_client: HttpClient, html_parser: HtmlParser, parse_service: ParseService,
+                 scheduler: Scheduler, outbox: Outbox):
         self._instance_name = instance_name
         logger = logging.getLogger(self._instance_name)
         logger.setLevel(logging_level)
         super().__init__(queue_manager=queue_manager,
                          download_files=download_files,
-                         files_directory=files_directory,
+                         file_store=file_store,
                          colour=colour,
                          author=self._AUTHOR,
                          logger=logger,
                          wait_time=wait_time,
-                         state_change_queue=state_change_queue)
+                         state_change_queue=state_change_queue,
+                         http_client=http_client,
+                         html_parser=html_parser,
+                         parse_service=parse_service,
+                         scheduler=scheduler,
+                         outbox=outbox)
 
     async def _load_publications(self):
-        html = await self._get_site_content(url=self._EN_URL)
-        beautiful_soap = BeautifulSoup(html, 'html5lib')
-        months = beautiful_soap.findAll('div', class_='monthWrap')
+        html = await self._get_site_content_if_modified(url=self._EN_URL)
+        if html is None:
+            return
+        months = await self._extract(html, extractor=self._extract_months, regions=self._REGIONS)
 
         for month in months:
-            cards = month.findAll('img')
-            title_str = self._add_html_tag(month.find('h4').text.strip(), tag=self._TITLE_HTML_TAG)
+            title_str = self._add_html_tag(month.title, tag=self._TITLE_HTML_TAG)
             title = RichText(data=title_str, format_data=FormatData.HTML)
 
-            for card in cards:
-                publication = await self._create_publication_from_img(img=card, rich_title=title)
+            for card in month.image_sources:
+                publication = await self._create_publication_from_img(img_src=card, rich_title=title)
                 if publication:
                     transaction_data = TransactionData(transaction_id=publication.publication_id,
                                                        publications=[publication])
                     await self._put_in_queue(transaction_data=transaction_data)
 
+    async def _list_identifiers(self) -> List[str]:
+        html = await self._get_site_content(url=self._EN_URL)
+        months = await self._extract(html, extractor=self._extract_months, regions=self._REGIONS)
+        return await self._get_image_identifiers(img_srcs=[card for month in months for card in month.image_sources])
+
+    @staticmethod
+    def _extract_months(beautiful_soap: BeautifulSoup) -> List[MonthRecord]:
+        """Extractor of months with their tournament cards."""
+        return [
+            MonthRecord(title=month.find('h4').text.strip(),
+                        image_sources=[img.attrs['src'] for img in month.findAll('img')])
+            for month in beautiful_soap.findAll('div', class_='monthWrap')
+        ]
+
     @classmethod
     def _get_custom_configuration(cls, *, configuration, senders):
         configurations = [
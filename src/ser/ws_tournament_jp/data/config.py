@@ -0,0 +1,11 @@
+"""Japanese Tournament Custom Config Module."""
+
+from dataclasses import dataclass
+
+from src.ser.common.itf.custom_config import CustomConfig
+
+
+@dataclass
+class Config(CustomConfig):
+    """Japanese tournament custom config."""
+    max_empty_windows: int
@@ -1,17 +1,27 @@
 """Weiß Schwarz - Japanese Edition - Tournament Module"""
 
+import asyncio
 import logging
+import time
 from asyncio import Queue
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 
+from src.inf.file_store.file_store import FileStore
+from src.inf.http_client.http_client import HttpClient
+from src.inf.outbox.outbox import Outbox
+from src.inf.parse_service.parse_service import ParseService
+from src.inf.scheduler.scheduler import Scheduler
 from src.ser.common.data.weiss_schwarz_barcelona_data import BrigadaSOSData
 from src.ser.common.enums.format_data import FormatData
-from src.ser.common.itf.custom_config import CustomConfig
+from src.ser.common.html_parser import HtmlParser
 from src.ser.common.queue_manager import QueueManager
 from src.ser.common.receiver_images_mixin import ReceiverImagesMixin
 from src.ser.common.rich_text import RichText
+from src.ser.common.value_object.html_region import HtmlRegion
 from src.ser.common.value_object.transacation_data import TransactionData
+from src.ser.ws_tournament_jp.data.config import Config
 from src.ser.ws_tournament_jp.models.identifier import Identifier, METADATA
 
 
@@ -28,47 +38,119 @@ class WSTournamentJp(ReceiverImagesMixin, BrigadaSOSData):
     _PUBLIC_URL = True
     _JP_URL = 'https://ws-tcg.com/events/list/battle_{}'
     _TITLE = "Japanese Edition - Monthly Shop Tournament Card"
+    _REGIONS = (HtmlRegion(tag='div', class_name='contents-box-main'), )
+    _LAST_ID_BEFORE_TRACKING = 850
+    _MIN_PROBE_WINDOW = 1
+    _MAX_PROBE_WINDOW = 32
+    _DEFAULT_MAX_EMPTY_WINDOWS = 4
+    _GAP_RECHECK_RANGE = 32
+    _EMPTY_PAGE_TTL = 60 * 60
 
-    def __init__(self, *, files_directory: str, instance_name: str, queue_manager: QueueManager, download_files: bool,
-                 wait_time: int, logging_level: str, state_change_queue: Queue, colour: int):
+    def __init__(self, *, file_store: FileStore, instance_name: str, queue_manager: QueueManager, download_files: bool,
+                 wait_time: int, logging_level: str, state_change_queue: Queue, colour: int,
+                 max_empty_windows: int, http_client: HttpClient, html_parser: HtmlParser, parse_service: ParseService,
+                 scheduler: Scheduler, outbox: Outbox):
         self._instance_name = instance_name
         logger = logging.getLogger(self._instance_name)
         logger.setLevel(logging_level)
         self._title = RichText(data=self._add_html_tag(self._TITLE, tag=self._TITLE_HTML_TAG), format_data=FormatData.HTML)
         super().__init__(download_files=download_files,
-                         files_directory=files_directory,
+                         file_store=file_store,
                          colour=colour,
                          author=self._AUTHOR,
                          logger=logger,
                          wait_time=wait_time,
                          state_change_queue=state_change_queue,
+                         http_client=http_client,
+                         html_parser=html_parser,
+                         parse_service=parse_service,
+                         scheduler=scheduler,
+                         outbox=outbox,
                          queue_manager=queue_manager)
+        self._max_empty_windows = max_empty_windows
+        self._empty_pages: Dict[int, float] = {}
 
     async def _load_publications(self):
-        if not self._cache:
-            self._cache = [850]
-        while True:
-            ws_id = max(self._cache) + 1
+        async for ws_id, images in self._probe():
             url = self._JP_URL.format(ws_id)
-            html = await self._get_site_content(url=url)
-            beautiful_soap = BeautifulSoup(html, 'html5lib')
-            main = beautiful_soap.find('div', class_='contents-box-main')
-
-            if not main:
-                self._logger.debug("No more entries.")
-                return
-            images = main.find_all('img')
-
             publications = []
             for image in images:
-                publications.append(await self._create_publication_from_img(img=image, url=url, check_cache=False, rich_title= self._title))
+                publications.append(await self._create_publication_from_img(img_src=image, url=url, check_cache=False, rich_title= self._title))
             transaction_data = TransactionData(transaction_id=ws_id, publications=publications)
             await self._put_in_queue(transaction_data=transaction_data)
 
+    async def _list_identifiers(self) -> List[int]:
+        return [ws_id async for ws_id, _ in self._probe()]
+
+    async def _probe(self) -> AsyncIterator[Tuple[int, List[str]]]:
+        """Yield id and images of tournaments that are not stored, in order of id. Next id is requested on every call.
+        While it has no tournament, following ids up to "max_empty_windows" and ids without tournament among the last
+        ones below highest id stored are only requested again once their empty result expires, so gaps are crossed and
+        late tournaments are found without requesting them on every call. Older gaps are not checked anymore. After a
+        tournament is found, windows of concurrent requests grow exponentially while all their pages have a
+        tournament, so a long catch up takes few round trips."""
+        max_id = self._dedup_index.max_id or self._LAST_ID_BEFORE_TRACKING
+        first_gap_id = max(self._LAST_ID_BEFORE_TRACKING, max_id - self._GAP_RECHECK_RANGE) + 1
+        now = time.monotonic()
+        self._empty_pages = {
+            ws_id: expires_at
+            for ws_id, expires_at in self._empty_pages.items() if ws_id >= first_gap_id and expires_at > now
+        }
+        gap_ids = await self._dedup_index.filter_new(range(first_gap_id, max_id))
+        for ws_id, images in await self._get_tournaments(ws_ids=gap_ids, skip_empty=True):
+            yield ws_id, images
+
+        ws_id = max_id + 1
+        window = self._MIN_PROBE_WINDOW
+        empty_windows = 0
+        idle = True
+        while empty_windows < self._max_empty_windows:
+            found = await self._get_tournaments(ws_ids=range(ws_id, ws_id + window),
+                                                skip_empty=idle and ws_id > max_id + 1)
+            ws_id += window
+            if not found:
+                empty_windows += 1
+                window = self._MIN_PROBE_WINDOW
+                continue
+            idle = False
+            empty_windows = 0
+            for page_id, images in found:
+                yield page_id, images
+            if len(found) == window:
+                window = min(window * 2, self._MAX_PROBE_WINDOW)
+        self._logger.debug("No more entries.")
+
+    async def _get_tournaments(self, *, ws_ids: Iterable[int], skip_empty: bool) -> List[Tuple[int, List[str]]]:
+        """Request pages concurrently and return id and images of those that have a tournament, in order of id. Pages
+        without tournament are remembered, if skip empty is set they are not requested again until it expires."""
+        ws_ids = [ws_id for ws_id in ws_ids if not (skip_empty and ws_id in self._empty_pages)]
+        pages = await asyncio.gather(*[self._get_tournament_images(ws_id=ws_id) for ws_id in ws_ids])
+        found = []
+        for ws_id, images in zip(ws_ids, pages):
+            if images is None:
+                self._empty_pages[ws_id] = time.monotonic() + self._EMPTY_PAGE_TTL
+            else:
+                self._empty_pages.pop(ws_id, None)
+                found.append((ws_id, images))
+        return found
+
+    async def _get_tournament_images(self, *, ws_id: int) -> Optional[List[str]]:
+        html = await self._get_site_content(url=self._JP_URL.format(ws_id))
+        return await self._extract(html, extractor=self._extract_images, regions=self._REGIONS)
+
+    @staticmethod
+    def _extract_images(beautiful_soap: BeautifulSoup) -> Optional[List[str]]:
+        """Extractor of tournament image urls. None when page has no tournament."""
+        main = beautiful_soap.find('div', class_='contents-box-main')
+        if not main:
+            return None
+        return [img.attrs['src'] for img in main.find_all('img')]
+
     @classmethod
     def _get_custom_configuration(cls, *, configuration, senders):
         configurations = [
-            CustomConfig(
+            Config(
+                max_empty_windows=configuration.get('max_empty_windows', cls._DEFAULT_MAX_EMPTY_WINDOWS),
                 instance_name=cls._get_instance_name(),
                 queue_manager=cls._get_queue_manager(config=configuration['send'], senders=senders),
             )